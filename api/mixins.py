@@ -0,0 +1,78 @@
+"""
+api/mixins.py
+=============
+Reusable mixins for the MediDiagnose REST API views.
+
+Contains:
+    - AutoPrefetchMixin: Derives ``select_related`` / ``prefetch_related``
+      lookups from the view's serializer so nested representations
+      never trigger N+1 queries.
+"""
+
+from __future__ import annotations
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+
+def _related_lookups(
+    serializer_class: type[serializers.BaseSerializer],
+    prefix: str = "",
+    in_prefetch: bool = False,
+) -> tuple[list[str], list[str]]:
+    """Collect the relation lookups needed by a serializer's nested fields.
+
+    Args:
+        serializer_class: Serializer whose declared fields are inspected.
+        prefix: Lookup path of the enclosing relation (used on recursion).
+        in_prefetch: ``True`` once the path crosses a to-many relation,
+            after which every nested relation must be prefetched too.
+
+    Returns:
+        Tuple of ``(select_related, prefetch_related)`` lookup lists.
+    """
+    select: list[str] = []
+    prefetch: list[str] = []
+
+    for name, field in serializer_class._declared_fields.items():
+        source: str = field.source or name
+        if source == "*":
+            continue
+        lookup: str = f"{prefix}{source.replace('.', '__')}"
+
+        if isinstance(field, serializers.ListSerializer):
+            nested = field.child
+            prefetch.append(lookup)
+            many = True
+        elif isinstance(field, serializers.BaseSerializer):
+            nested = field
+            (prefetch if in_prefetch else select).append(lookup)
+            many = in_prefetch
+        else:
+            continue
+
+        nested_select, nested_prefetch = _related_lookups(
+            type(nested), prefix=f"{lookup}__", in_prefetch=many
+        )
+        select.extend(nested_select)
+        prefetch.extend(nested_prefetch)
+
+    return select, prefetch
+
+
+class AutoPrefetchMixin:
+    """Eager-load the relations a list view's serializer will render.
+
+    Nested single-object serializers become ``select_related`` joins and
+    ``many=True`` serializers become ``prefetch_related`` lookups, so the
+    queryset stays in step with the serializer as nested fields are added.
+    """
+
+    def get_queryset(self) -> QuerySet:
+        queryset: QuerySet = super().get_queryset()
+        select, prefetch = _related_lookups(self.get_serializer_class())
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
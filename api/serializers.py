@@ -138,13 +138,23 @@ class DiagnosisRequestSerializer(serializers.Serializer):
     )
 
     def validate_symptom_ids(self, value: list[int]) -> list[int]:
-        """Ensure all symptom IDs actually exist in the database."""
+        """Ensure all symptom IDs actually exist in the database.
+
+        Duplicate IDs are dropped (first occurrence wins) before the
+        lookup.  The common case is checked with a single ``COUNT``;
+        the existing IDs are only fetched when something is missing, to
+        build the error message.
+        """
+        unique: list[int] = list(dict.fromkeys(value))
+        if SymptomModel.objects.filter(id__in=unique).count() == len(unique):
+            return unique
+
         existing_ids = set(
-            SymptomModel.objects.filter(id__in=value).values_list("id", flat=True)
+            SymptomModel.objects.filter(id__in=unique).values_list("id", flat=True)
         )
-        missing = set(value) - existing_ids
+        missing = set(unique) - existing_ids
         if missing:
             raise serializers.ValidationError(
                 f"The following symptom IDs do not exist: {sorted(missing)}"
             )
-        return value
+        return unique
@@ -0,0 +1,111 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from knowledge_base.models import DiagnosticRuleModel, DiseaseModel, SymptomModel
+from patient_cases.models import PatientCaseModel
+
+LOCMEM_CACHES: dict = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "kb": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "kb",
+    },
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DiagnosisAPITests(TestCase):
+    """Request and response contract of the REST endpoints."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fever = SymptomModel.objects.create(name="Fever", category="GENERAL")
+        cls.cough = SymptomModel.objects.create(name="Cough", category="RESPIRATORY")
+        cls.flu = DiseaseModel.objects.create(
+            name="Influenza", description="d", treatments="t", urgency_level="MEDIUM"
+        )
+        rule = DiagnosticRuleModel.objects.create(
+            name="FluRule",
+            then_disease=cls.flu,
+            confidence_factor=80,
+            explanation_template="{symptoms} suggest {disease}.",
+        )
+        rule.if_symptoms.set([cls.fever, cls.cough])
+
+    def setUp(self):
+        caches["kb"].clear()
+        self.url = reverse("api:diagnose")
+
+    def _diagnose(self, **kwargs):
+        payload = {"patient_id": "PT-1", "symptom_ids": [self.fever.id, self.cough.id]}
+        return self.client.post(self.url, payload, **kwargs)
+
+    def assertDiagnosisResponse(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        body = response.json()
+        self.assertEqual(body["strategy"], "FORWARD_CHAINING")
+        self.assertEqual(body["diseases"][0]["disease_id"], self.flu.id)
+        self.assertEqual(body["diseases"][0]["disease_name"], "Influenza")
+        self.assertEqual(
+            body["rules_fired"][0]["explanation"], "Fever, Cough suggest Influenza."
+        )
+
+        case = PatientCaseModel.objects.get(pk=body["case_id"])
+        self.assertEqual(case.patient_identifier, "PT-1")
+        self.assertEqual(case.top_disease_name, "Influenza")
+        self.assertEqual(
+            list(case.results.values_list("disease_id", flat=True)), [self.flu.id]
+        )
+
+    def test_diagnose_json(self):
+        self.assertDiagnosisResponse(self._diagnose(content_type="application/json"))
+
+    def test_diagnose_form_data(self):
+        self.assertDiagnosisResponse(self._diagnose())
+
+    def test_diagnose_rejects_unknown_symptoms(self):
+        response = self.client.post(
+            self.url,
+            {"patient_id": "PT-1", "symptom_ids": [self.fever.id, 999999]},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("symptom_ids", response.json())
+        self.assertFalse(PatientCaseModel.objects.exists())
+
+    def test_diagnose_requires_patient_id(self):
+        response = self.client.post(
+            self.url, {"symptom_ids": [self.fever.id]}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("patient_id", response.json())
+
+    def test_explanation(self):
+        case_id = self._diagnose(content_type="application/json").json()["case_id"]
+
+        response = self.client.get(reverse("api:explanation", args=[case_id]))
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["case_id"], case_id)
+        self.assertIn("Influenza", body["explanation"])
+
+    def test_explanation_for_unknown_case(self):
+        response = self.client.get(reverse("api:explanation", args=[999999]))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("error", response.json())
+
+    def test_symptom_list(self):
+        response = self.client.get(
+            reverse("api:symptom-list"), {"category": "RESPIRATORY"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        rows = body["results"] if isinstance(body, dict) else body
+        self.assertEqual([row["name"] for row in rows], ["Cough"])
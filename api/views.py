@@ -12,9 +12,11 @@ Contains:
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
@@ -23,6 +25,7 @@ from inference_engine.services.exceptions import InferenceEngineError
 from inference_engine.services.forward_chaining import ForwardChainingStrategy
 from knowledge_base.models import SymptomModel
 
+from .mixins import AutoPrefetchMixin
 from .serializers import (
     DiagnosisRequestSerializer,
     SymptomSerializer,
@@ -31,12 +34,23 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _get_diagnosis_service() -> DiagnosisService:
+    """Return the process-wide forward-chaining diagnosis service.
+
+    Built on first use rather than at import time so the app registry
+    is ready.  The service and its strategy keep no per-request state,
+    so a single instance is shared by every request in the process.
+    """
+    return DiagnosisService(strategy=ForwardChainingStrategy())
+
+
 # ─────────────────────────────────────────────────────────────────────
 # Symptom listing
 # ─────────────────────────────────────────────────────────────────────
 
 
-class SymptomListAPIView(generics.ListAPIView):
+class SymptomListAPIView(AutoPrefetchMixin, generics.ListAPIView):
     """List all symptoms with optional filtering.
 
     **Filters** (query params):
@@ -76,9 +90,13 @@ class DiagnosisAPIView(APIView):
             "symptom_ids": [1, 2, 3]
         }
 
-    Returns the full inference result with ``case_id``.
+    Returns the full inference result with ``case_id``.  JSON only:
+    the single renderer skips content negotiation and the browsable
+    API on this hot endpoint.
     """
 
+    renderer_classes = [JSONRenderer]
+
     def post(self, request):
         serializer = DiagnosisRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -87,9 +105,7 @@ class DiagnosisAPIView(APIView):
         symptom_ids: list[int] = serializer.validated_data["symptom_ids"]
 
         try:
-            strategy = ForwardChainingStrategy()
-            service = DiagnosisService(strategy=strategy)
-            result = service.diagnose(
+            result = _get_diagnosis_service().diagnose(
                 symptoms=symptom_ids,
                 patient_id=patient_id,
             )
@@ -121,11 +137,13 @@ class ExplanationAPIView(APIView):
     Returns a JSON object with the human-readable explanation string.
     """
 
+    renderer_classes = [JSONRenderer]
+
     def get(self, request, case_id: int):
         try:
-            strategy = ForwardChainingStrategy()
-            service = DiagnosisService(strategy=strategy)
-            explanation: str = service.get_explanation(case_id=case_id)
+            explanation: str = _get_diagnosis_service().get_explanation(
+                case_id=case_id
+            )
             return Response(
                 {"case_id": case_id, "explanation": explanation},
                 status=status.HTTP_200_OK,
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.11 on 2026-10-15 17:33
+
+import medidiagnose.encoders
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('explanations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inferencetracemodel',
+            name='confidence_scores_calculated',
+            field=models.JSONField(default=dict, encoder=medidiagnose.encoders.OrjsonEncoder, help_text='JSON dict mapping disease IDs/names to calculated confidence scores, e.g. {"Flu": 85.0, "Cold": 60.5}.'),
+        ),
+        migrations.AlterField(
+            model_name='inferencetracemodel',
+            name='rules_fired',
+            field=models.JSONField(default=list, encoder=medidiagnose.encoders.OrjsonEncoder, help_text='JSON list of rules that fired during inference, e.g. [{"rule_id": 1, "name": "Rule-Flu-01", "confidence": 85}].'),
+        ),
+    ]
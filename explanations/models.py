@@ -13,6 +13,7 @@ from __future__ import annotations
 
 from django.db import models
 
+from medidiagnose.encoders import OrjsonEncoder
 from patient_cases.models import PatientCaseModel
 
 
@@ -57,6 +58,7 @@ class InferenceTraceModel(models.Model):
     )
     rules_fired = models.JSONField(
         default=list,
+        encoder=OrjsonEncoder,
         help_text=(
             "JSON list of rules that fired during inference, "
             'e.g. [{"rule_id": 1, "name": "Rule-Flu-01", "confidence": 85}].'
@@ -64,6 +66,7 @@ class InferenceTraceModel(models.Model):
     )
     confidence_scores_calculated = models.JSONField(
         default=dict,
+        encoder=OrjsonEncoder,
         help_text=(
             "JSON dict mapping disease IDs/names to calculated confidence scores, "
             'e.g. {"Flu": 85.0, "Cold": 60.5}.'
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class InferenceEngineConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inference_engine'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -13,21 +13,109 @@ Algorithm:
 
 from __future__ import annotations
 
+import copy
 import logging
 import time
+from functools import partial
 from typing import Any
 
 from django.db import DatabaseError
-from django.db.models import QuerySet
 
-from knowledge_base.models import DiagnosticRuleModel, SymptomModel
+from knowledge_base.models import compile_explanation_template
 
 from .base_strategy import InferenceStrategy
 from .exceptions import InferenceEngineError, NoMatchingRuleError
-from .knowledge_base_repository import KnowledgeBaseRepository
+from .knowledge_base_repository import KnowledgeBaseRepository, get_kb_version
+from .result_memo import ResultMemo
 
 logger: logging.Logger = logging.getLogger(__name__)
 
+# number of (kb version, disease, symptom set) results kept per strategy
+# instance, and how long each may be served
+_RESULT_CACHE_SIZE: int = 1024
+_RESULT_CACHE_TTL: float = 60.0
+
+
+def _names_for(mask: int, names: list[str]) -> list[str]:
+    """Return the names of the symptoms whose bits are set in ``mask``."""
+    found: list[str] = []
+    while mask:
+        low: int = mask & -mask
+        found.append(names[low.bit_length() - 1])
+        mask ^= low
+    return found
+
+
+def _evaluate_rule(
+    rule: dict, patient_mask: int, names: list[str]
+) -> tuple[dict, dict | None, int]:
+    """Score a single rule row against the patient's symptom mask.
+
+    Pure function of its arguments.
+
+    Args:
+        rule: Row from :meth:`KnowledgeBaseRepository.get_rule_rows_by_disease`.
+        patient_mask: Bitmask of the patient's symptoms in the rule's
+            bit numbering.
+        names: Symptom names indexed by bit position.
+
+    Returns:
+        Tuple of ``(evaluation, fired, missing_mask)`` where ``fired`` is
+        the ``rules_fired`` record, or ``None`` when nothing matched.
+    """
+    required_mask: int = rule["required_mask"]
+    matched_mask: int = required_mask & patient_mask
+    missing_mask: int = required_mask & ~patient_mask
+
+    # resolve names for readability
+    required_names: list[str] = _names_for(required_mask, names)
+
+    if not matched_mask:
+        # nothing overlaps: the rule cannot fire or raise the best score,
+        # so skip the scoring and explanation work
+        return {
+            "rule_id": rule["id"],
+            "rule_name": rule["name"],
+            "confidence_factor": rule["confidence_factor"],
+            "required_symptoms": required_names,
+            "matched_symptoms": [],
+            "missing_symptoms": list(required_names),
+            "matched_count": 0,
+            "required_count": rule["required_count"],
+            "satisfaction_score": 0.0,
+            "is_fully_satisfied": not missing_mask,
+        }, None, missing_mask
+
+    matched: int = matched_mask.bit_count()
+    required: int = rule["required_count"]
+    satisfaction: float = matched / required
+    matched_names: list[str] = _names_for(matched_mask, names)
+
+    evaluation: dict = {
+        "rule_id": rule["id"],
+        "rule_name": rule["name"],
+        "confidence_factor": rule["confidence_factor"],
+        "required_symptoms": required_names,
+        "matched_symptoms": matched_names,
+        "missing_symptoms": _names_for(missing_mask, names),
+        "matched_count": matched,
+        "required_count": required,
+        "satisfaction_score": satisfaction,
+        "is_fully_satisfied": not missing_mask,
+    }
+    # only the template inputs are kept; the text is rendered by
+    # explain_result, or by DiagnosisService before it returns or
+    # persists the result
+    fired: dict = {
+        "rule_id": rule["id"],
+        "rule_name": rule["name"],
+        "satisfaction_score": satisfaction,
+        "matched_symptoms": matched_names,
+        "disease_name": rule["disease_name"],
+        "explanation": None,
+    }
+    return evaluation, fired, missing_mask
+
 
 class BackwardChainingStrategy(InferenceStrategy):
     """Backward chaining: verify whether a *specific* disease is
@@ -39,6 +127,7 @@ class BackwardChainingStrategy(InferenceStrategy):
 
     def __init__(self) -> None:
         self.repository: KnowledgeBaseRepository = KnowledgeBaseRepository()
+        self._memo: ResultMemo = ResultMemo(_RESULT_CACHE_SIZE, _RESULT_CACHE_TTL)
 
     def execute_inference(self, symptoms: list[int], **kwargs: Any) -> dict:
         """Verify a target disease against the patient's symptoms.
@@ -63,6 +152,8 @@ class BackwardChainingStrategy(InferenceStrategy):
                             "required_symptoms": [...],
                             "matched_symptoms": [...],
                             "missing_symptoms": [...],
+                            "matched_count": int,
+                            "required_count": int,
                             "satisfaction_score": float,
                             "is_fully_satisfied": bool,
                         },
@@ -71,9 +162,15 @@ class BackwardChainingStrategy(InferenceStrategy):
                     "best_satisfaction_score": float,
                     "overall_missing_symptoms": [...],
                     "rules_fired": [...],
+                    "timing": {"db_ms": int, "compute_ms": int, "total_ms": int},
                     "execution_time_ms": int,
                 }
 
+            ``timing["db_ms"]`` and ``timing["compute_ms"]`` describe the
+            evaluation that produced the result (which may have been
+            served from the memo cache); ``total_ms`` and
+            ``execution_time_ms`` are the wall-clock time of this call.
+
         Raises:
             ValueError: If ``target_disease_id`` is not provided.
             NoMatchingRuleError: If no rules exist for the target disease.
@@ -84,81 +181,89 @@ class BackwardChainingStrategy(InferenceStrategy):
             raise ValueError("target_disease_id is required for backward chaining")
 
         start: float = time.perf_counter()
-        symptom_set: set[int] = set(symptoms)
 
+        # results are a pure function of (kb version, disease, symptom set);
+        # copy so callers can annotate the dict without touching the memo
+        symptom_set: frozenset[int] = frozenset(symptoms)
+        cached, _ = self._memo.get_or_compute(
+            (get_kb_version(), target_disease_id, symptom_set),
+            partial(self._evaluate, target_disease_id, symptom_set),
+        )
+        result: dict = copy.deepcopy(cached)
+        elapsed_ms: int = int((time.perf_counter() - start) * 1000)
+        result["timing"]["total_ms"] = elapsed_ms
+        result["execution_time_ms"] = elapsed_ms
+
+        logger.info(
+            "backward chaining complete for disease %s: best score %.2f in %dms "
+            "(evaluation: db %dms, compute %dms)",
+            target_disease_id,
+            result["best_satisfaction_score"],
+            elapsed_ms,
+            result["timing"]["db_ms"],
+            result["timing"]["compute_ms"],
+        )
+        return result
+
+    def _evaluate(
+        self, target_disease_id: int, symptom_set: frozenset[int]
+    ) -> dict:
+        """Uncached core of :meth:`execute_inference`.
+
+        Args:
+            target_disease_id: PK of the disease to verify.
+            symptom_set: The patient's symptom IDs.
+
+        Returns:
+            The result dict described in :meth:`execute_inference`,
+            without ``execution_time_ms`` and ``timing["total_ms"]``.
+        """
+        t0: float = time.perf_counter()
         try:
-            rules: QuerySet[DiagnosticRuleModel] = (
-                self.repository.get_rules_by_disease(target_disease_id)
+            # plain dict rows + a symptom-name map: the loop below is pure
+            # dict / int arithmetic with no ORM instances involved
+            rules, name_map = self.repository.get_rule_rows_by_disease(
+                target_disease_id
             )
 
-            if not rules.exists():
-                raise NoMatchingRuleError(symptom_ids=symptoms)
+            t1: float = time.perf_counter()
 
-            # we need the disease name from the first rule
-            target_disease_name: str = rules[0].then_disease.name
+            if not rules:
+                raise NoMatchingRuleError(symptom_ids=sorted(symptom_set))
 
-            evaluated: list[dict] = []
-            rules_fired: list[dict] = []
-            all_missing: set[int] = set()
-            best_score: float = 0.0
+            target_disease_name: str = rules[0]["disease_name"]
 
-            for rule in rules:
-                required_ids: set[int] = set(
-                    rule.if_symptoms.values_list("id", flat=True)
-                )
-                matched_ids: set[int] = symptom_set & required_ids
-                missing_ids: set[int] = required_ids - symptom_set
+            # bit n of every rule mask is the n-th symptom of name_map, which
+            # follows the model ordering (category, name); walking set bits
+            # from the lowest therefore yields names already sorted
+            names: list[str] = list(name_map.values())
+            patient_mask: int = 0
+            for pos, symptom_id in enumerate(name_map):
+                if symptom_id in symptom_set:
+                    patient_mask |= 1 << pos
 
-                satisfaction: float = (
-                    len(matched_ids) / len(required_ids) if required_ids else 0.0
-                )
+            evaluate = partial(_evaluate_rule, patient_mask=patient_mask, names=names)
+            outcomes: list[tuple[dict, dict | None, int]] = list(map(evaluate, rules))
 
-                # resolve names for readability
-                matched_names: list[str] = list(
-                    SymptomModel.objects
-                    .filter(id__in=matched_ids)
-                    .values_list("name", flat=True)
-                ) if matched_ids else []
-
-                missing_names: list[str] = list(
-                    SymptomModel.objects
-                    .filter(id__in=missing_ids)
-                    .values_list("name", flat=True)
-                ) if missing_ids else []
-
-                required_names: list[str] = list(
-                    SymptomModel.objects
-                    .filter(id__in=required_ids)
-                    .values_list("name", flat=True)
-                )
+            evaluated: list[dict] = []
+            rules_fired: list[dict] = []
+            all_missing: int = 0
+            # best score kept as an integer ratio (matched, required) and
+            # compared by cross-multiplication; divided once at the end
+            best_matched: int = 0
+            best_required: int = 1
 
-                rule_result: dict = {
-                    "rule_id": rule.id,
-                    "rule_name": rule.name,
-                    "confidence_factor": rule.confidence_factor,
-                    "required_symptoms": required_names,
-                    "matched_symptoms": matched_names,
-                    "missing_symptoms": missing_names,
-                    "satisfaction_score": round(satisfaction, 4),
-                    "is_fully_satisfied": len(missing_ids) == 0,
-                }
+            for rule_result, fired, missing_mask in outcomes:
                 evaluated.append(rule_result)
+                all_missing |= missing_mask
+                if fired is None:
+                    continue
+                rules_fired.append(fired)
 
-                if satisfaction > 0:
-                    rules_fired.append({
-                        "rule_id": rule.id,
-                        "rule_name": rule.name,
-                        "satisfaction_score": round(satisfaction, 4),
-                        "explanation": rule.explanation_template.format(
-                            symptoms=", ".join(matched_names),
-                            disease=target_disease_name,
-                        ),
-                    })
-
-                all_missing.update(missing_ids)
-
-                if satisfaction > best_score:
-                    best_score = satisfaction
+                matched: int = rule_result["matched_count"]
+                required: int = rule_result["required_count"]
+                if matched * best_required > best_matched * required:
+                    best_matched, best_required = matched, required
 
         except (NoMatchingRuleError, ValueError):
             raise
@@ -170,30 +275,21 @@ class BackwardChainingStrategy(InferenceStrategy):
             ) from exc
 
         # resolve overall missing symptom names
-        overall_missing_names: list[str] = list(
-            SymptomModel.objects
-            .filter(id__in=all_missing)
-            .values_list("name", flat=True)
-        ) if all_missing else []
-
-        elapsed_ms: int = int((time.perf_counter() - start) * 1000)
-
-        logger.info(
-            "backward chaining complete for disease %s: best score %.2f in %dms",
-            target_disease_id,
-            best_score,
-            elapsed_ms,
-        )
+        overall_missing_names: list[str] = _names_for(all_missing, names)
+        t2: float = time.perf_counter()
 
         return {
             "strategy": "BACKWARD_CHAINING",
             "target_disease_id": target_disease_id,
             "target_disease_name": target_disease_name,
             "rules_evaluated": evaluated,
-            "best_satisfaction_score": round(best_score, 4),
+            "best_satisfaction_score": best_matched / best_required,
             "overall_missing_symptoms": overall_missing_names,
             "rules_fired": rules_fired,
-            "execution_time_ms": elapsed_ms,
+            "timing": {
+                "db_ms": int((t1 - t0) * 1000),
+                "compute_ms": int((t2 - t1) * 1000),
+            },
         }
 
     def explain_result(self, result: dict) -> str:
@@ -233,4 +329,25 @@ class BackwardChainingStrategy(InferenceStrategy):
                     f"  missing: {', '.join(rule['missing_symptoms'])}"
                 )
 
+        fired: list[dict] = result.get("rules_fired", [])
+        if fired:
+            # render deferred explanations from the compiled rules (no query
+            # on a warm cache)
+            templates: dict[int, str] = {
+                rule.id: rule.explanation_template
+                for rule in self.repository.get_compiled_rules()
+            }
+            lines.append("")
+            lines.append("--- explanations ---")
+            for rule in fired:
+                explanation: str | None = rule.get("explanation")
+                if explanation is None and rule["rule_id"] in templates:
+                    explanation = compile_explanation_template(templates[rule["rule_id"]])(
+                        symptoms=", ".join(rule["matched_symptoms"]),
+                        disease=rule["disease_name"],
+                    )
+                if explanation:
+                    lines.append(f"- {rule['rule_name']}: {explanation}")
+
         return "\n".join(lines)
+
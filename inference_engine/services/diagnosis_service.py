@@ -13,13 +13,17 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-from knowledge_base.models import SymptomModel
-from patient_cases.models import PatientCaseModel
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+
 from explanations.models import InferenceTraceModel
+from knowledge_base.models import compile_explanation_template
+from patient_cases.models import PatientCaseModel, PatientCaseResultModel
 
 from .base_strategy import InferenceStrategy
 from .exceptions import InferenceEngineError, InvalidSymptomError
-from .knowledge_base_repository import KnowledgeBaseRepository
+from .knowledge_base_repository import CompiledRule, KnowledgeBaseRepository
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -64,6 +68,7 @@ class DiagnosisService:
         self,
         symptoms: list[int],
         patient_id: str,
+        persist_trace: bool | None = None,
         **kwargs: Any,
     ) -> dict:
         """Run a full diagnostic session: validate → infer → persist.
@@ -71,6 +76,10 @@ class DiagnosisService:
         Args:
             symptoms: List of symptom primary-key IDs.
             patient_id: Opaque patient / session identifier.
+            persist_trace: Store the full case and its
+                :class:`InferenceTraceModel`; when ``False`` only a
+                minimal case is saved.  Defaults to
+                ``settings.INFERENCE_ENGINE_PERSIST_TRACE``.
             **kwargs: Extra arguments forwarded to the strategy's
                 :meth:`execute_inference` (e.g. ``target_disease_id``
                 for backward chaining).
@@ -84,22 +93,14 @@ class DiagnosisService:
             NoMatchingRuleError: If no rules match.
             InferenceEngineError: On unexpected errors.
         """
-        # validate symptom ids exist in the knowledge base
-        all_exist, missing = self._repository.validate_symptom_existence(symptoms)
-        if not all_exist:
-            raise InvalidSymptomError(missing_ids=missing)
-
-        logger.info(
-            "starting diagnosis for patient %s with %d symptoms using %s",
-            patient_id,
-            len(symptoms),
-            self._strategy.__class__.__name__,
-        )
+        # one {id: name} map shared by validation, inference and persistence
+        symptom_map: dict[int, str] = self._repository.get_symptom_map(symptoms)
+        self._check_symptoms(symptoms, symptom_map, patient_id)
 
         try:
             # execute the inference strategy
             result: dict = self._strategy.execute_inference(
-                symptoms=symptoms, **kwargs
+                symptoms=symptoms, symptom_map=symptom_map, **kwargs
             )
 
             # persist the case and inference trace
@@ -107,6 +108,8 @@ class DiagnosisService:
                 result=result,
                 patient_id=patient_id,
                 symptoms=symptoms,
+                symptom_map=symptom_map,
+                persist_trace=persist_trace,
             )
 
             # attach the persisted case id to the result
@@ -128,30 +131,289 @@ class DiagnosisService:
                 details={"original_error": str(exc)},
             ) from exc
 
+    async def adiagnose(
+        self,
+        symptoms: list[int],
+        patient_id: str,
+        persist_trace: bool | None = None,
+        **kwargs: Any,
+    ) -> dict:
+        """Async variant of :meth:`diagnose` for ASGI callers.
+
+        The symptom lookup uses the async ORM and cache APIs; inference
+        (CPU-bound) and the transactional persistence step run in a
+        worker thread via ``sync_to_async`` so the event loop is never
+        blocked.
+
+        Args:
+            symptoms: List of symptom primary-key IDs.
+            patient_id: Opaque patient / session identifier.
+            persist_trace: As in :meth:`diagnose`.
+            **kwargs: Forwarded to the strategy, as in :meth:`diagnose`.
+
+        Returns:
+            The same dict as :meth:`diagnose`.
+
+        Raises:
+            InvalidSymptomError: If any symptom IDs are invalid.
+            NoMatchingRuleError: If no rules match.
+            InferenceEngineError: On unexpected errors.
+        """
+        symptom_map: dict[int, str] = await self._repository.aget_symptom_map(symptoms)
+        self._check_symptoms(symptoms, symptom_map, patient_id)
+
+        try:
+            result: dict = await sync_to_async(self._strategy.execute_inference)(
+                symptoms=symptoms, symptom_map=symptom_map, **kwargs
+            )
+            case: PatientCaseModel = await sync_to_async(self._persist_result)(
+                result=result,
+                patient_id=patient_id,
+                symptoms=symptoms,
+                symptom_map=symptom_map,
+                persist_trace=persist_trace,
+            )
+            result["case_id"] = case.id
+
+            logger.info(
+                "diagnosis complete for patient %s — case id %s",
+                patient_id,
+                case.id,
+            )
+            return result
+
+        except (InvalidSymptomError, InferenceEngineError):
+            raise
+        except Exception as exc:
+            logger.exception("unexpected error during diagnosis")
+            raise InferenceEngineError(
+                message="An unexpected error occurred during diagnosis.",
+                details={"original_error": str(exc)},
+            ) from exc
+
+    def diagnose_many(
+        self,
+        jobs: list[tuple[list[int], str]],
+        persist_trace: bool | None = None,
+        **kwargs: Any,
+    ) -> list[dict]:
+        """Diagnose a batch of patients and persist them with bulk inserts.
+
+        Every job is validated and inferred first; the cases and traces
+        are then written by :meth:`bulk_persist_results` (two batched
+        ``INSERT`` streams in one transaction), so a failing job leaves
+        nothing behind.
+
+        Args:
+            jobs: ``(symptoms, patient_id)`` pairs.
+            persist_trace: As in :meth:`diagnose`.
+            **kwargs: Forwarded to every :meth:`execute_inference` call.
+
+        Returns:
+            One result dict per job, in input order, each with its
+            ``case_id``.
+
+        Raises:
+            InvalidSymptomError: If any job has invalid symptom IDs.
+            NoMatchingRuleError: If no rules match for some job.
+            InferenceEngineError: On unexpected errors.
+        """
+        known: dict[int, str] = self._repository.get_symptom_names()
+        entries: list[tuple[dict, str, list[int]]] = []
+
+        try:
+            for symptoms, patient_id in jobs:
+                wanted: set[int] = set(symptoms)
+                symptom_map: dict[int, str] = {
+                    sid: name for sid, name in known.items() if sid in wanted
+                }
+                self._check_symptoms(symptoms, symptom_map, patient_id)
+                result: dict = self._strategy.execute_inference(
+                    symptoms=symptoms, symptom_map=symptom_map, **kwargs
+                )
+                entries.append((result, patient_id, symptoms))
+
+            cases: list[PatientCaseModel] = self.bulk_persist_results(
+                entries, persist_trace=persist_trace
+            )
+
+        except (InvalidSymptomError, InferenceEngineError):
+            raise
+        except Exception as exc:
+            logger.exception("unexpected error during batch diagnosis")
+            raise InferenceEngineError(
+                message="An unexpected error occurred during batch diagnosis.",
+                details={"original_error": str(exc)},
+            ) from exc
+
+        for (result, _, _), case in zip(entries, cases):
+            result["case_id"] = case.id
+        return [result for result, _, _ in entries]
+
+    def _check_symptoms(
+        self,
+        symptoms: list[int],
+        symptom_map: dict[int, str],
+        patient_id: str,
+    ) -> None:
+        """Validate the requested symptoms and log the start of a session.
+
+        Args:
+            symptoms: Symptom IDs submitted by the caller.
+            symptom_map: ``{id: name}`` of the submitted IDs that exist.
+            patient_id: Patient / session identifier.
+
+        Raises:
+            InvalidSymptomError: If any symptom IDs are invalid.
+        """
+        # validate symptom ids exist in the knowledge base
+        missing: list[int] = sorted(set(symptoms) - symptom_map.keys())
+        if missing:
+            logger.warning("symptom ids not found in knowledge base: %s", missing)
+            raise InvalidSymptomError(missing_ids=missing)
+
+        logger.info(
+            "starting diagnosis for patient %s with %d symptoms using %s",
+            patient_id,
+            len(symptoms),
+            self._strategy.__class__.__name__,
+        )
+
     def _persist_result(
         self,
         result: dict,
         patient_id: str,
         symptoms: list[int],
+        symptom_map: dict[int, str] | None = None,
+        persist_trace: bool | None = None,
     ) -> PatientCaseModel:
         """Save the inference result to the database.
 
-        Creates a :class:`PatientCaseModel` and a linked
-        :class:`InferenceTraceModel`.
+        Creates a :class:`PatientCaseModel`, its
+        :class:`PatientCaseResultModel` rows and a linked
+        :class:`InferenceTraceModel` in a single transaction.  With
+        ``persist_trace=False`` only a minimal case (and its result rows)
+        is saved.
 
         Args:
             result: Dict returned by the inference strategy.
             patient_id: Patient / session identifier.
             symptoms: Original symptom IDs submitted.
+            symptom_map: Optional ``{id: name}`` map of ``symptoms``.
+            persist_trace: Whether to write the inference trace; defaults
+                to ``settings.INFERENCE_ENGINE_PERSIST_TRACE``.
 
         Returns:
             The newly created :class:`PatientCaseModel`.
         """
-        # build the symptoms snapshot
-        symptom_objects = SymptomModel.objects.filter(id__in=symptoms)
-        symptoms_snapshot: list[dict] = [
-            {"id": s.id, "name": s.name} for s in symptom_objects
+        if persist_trace is None:
+            persist_trace = getattr(settings, "INFERENCE_ENGINE_PERSIST_TRACE", True)
+        case, trace = self._build_records(
+            result, patient_id, symptoms, symptom_map, persist_trace=persist_trace
+        )
+
+        with transaction.atomic():
+            case.save()
+            PatientCaseResultModel.objects.bulk_create(
+                self._build_result_rows(case), batch_size=_bulk_batch_size()
+            )
+            if trace is not None:
+                trace.patient_case = case
+                trace.save()
+
+        logger.info(
+            "persisted case %s %s inference trace",
+            case.id,
+            "with" if trace is not None else "without",
+        )
+        return case
+
+    def bulk_persist_results(
+        self,
+        results: list[tuple[dict, str, list[int]]],
+        persist_trace: bool | None = None,
+    ) -> list[PatientCaseModel]:
+        """Save many inference results with batched inserts.
+
+        Cases, result rows and traces are each written with
+        ``bulk_create`` in batches of :func:`_bulk_batch_size`, all inside
+        one transaction.
+
+        Args:
+            results: ``(result, patient_id, symptoms)`` tuples, with the
+                same meaning as the arguments of :meth:`_persist_result`.
+            persist_trace: As in :meth:`_persist_result`; when ``False``
+                only the minimal cases are inserted.
+
+        Returns:
+            The created :class:`PatientCaseModel` instances, in input
+            order and with primary keys set.
+        """
+        if persist_trace is None:
+            persist_trace = getattr(settings, "INFERENCE_ENGINE_PERSIST_TRACE", True)
+        batch_size: int = _bulk_batch_size()
+        records: list[tuple[PatientCaseModel, InferenceTraceModel | None]] = [
+            self._build_records(
+                result, patient_id, symptoms, persist_trace=persist_trace
+            )
+            for result, patient_id, symptoms in results
         ]
+        # bulk_create skips save(), which normally fills these
+        for case, _ in records:
+            case.sync_summary_fields()
+
+        with transaction.atomic():
+            cases: list[PatientCaseModel] = PatientCaseModel.objects.bulk_create(
+                [case for case, _ in records], batch_size=batch_size
+            )
+            PatientCaseResultModel.objects.bulk_create(
+                [row for case in cases for row in self._build_result_rows(case)],
+                batch_size=batch_size,
+            )
+            if persist_trace:
+                for case, trace in records:
+                    trace.patient_case = case
+                InferenceTraceModel.objects.bulk_create(
+                    [trace for _, trace in records], batch_size=batch_size
+                )
+
+        logger.info(
+            "persisted %d cases %s inference traces",
+            len(cases),
+            "with" if persist_trace else "without",
+        )
+        return cases
+
+    def _build_records(
+        self,
+        result: dict,
+        patient_id: str,
+        symptoms: list[int],
+        symptom_map: dict[int, str] | None = None,
+        persist_trace: bool = True,
+    ) -> tuple[PatientCaseModel, InferenceTraceModel | None]:
+        """Build the unsaved case and trace for an inference result.
+
+        Args:
+            result: Dict returned by the inference strategy.
+            patient_id: Patient / session identifier.
+            symptoms: Original symptom IDs submitted.
+            symptom_map: Optional ``{id: name}`` map of ``symptoms``;
+                looked up from the repository when omitted.
+            persist_trace: When ``False`` the case carries only the
+                patient identifier and inferred results, and no trace
+                is built.
+
+        Returns:
+            Tuple of ``(case, trace)``; the trace is not yet linked to
+            the case, which has no primary key until it is saved, and
+            is ``None`` when ``persist_trace`` is ``False``.
+        """
+        # read the result once up front
+        diseases: list[dict] = result.get("diseases", [])
+        rules_fired: list[dict] = result.get("rules_fired", [])
+        strategy_label: str = result.get("strategy", "FORWARD_CHAINING")
+        execution_time_ms: int = result.get("execution_time_ms", 0)
 
         # build the inferred results payload
         inferred: list[dict] = [
@@ -160,19 +422,39 @@ class DiagnosisService:
                 "disease_name": d["disease_name"],
                 "final_confidence": d["final_confidence"],
             }
-            for d in result.get("diseases", [])
+            for d in diseases
+        ]
+
+        # strategies may defer explanation rendering (forward chaining only
+        # renders the top-ranked diseases); the returned result and the
+        # persisted trace need all of them, whether or not a trace is kept
+        self._render_missing_explanations(rules_fired)
+
+        if not persist_trace:
+            return (
+                PatientCaseModel(
+                    patient_identifier=patient_id, inferred_results=inferred
+                ),
+                None,
+            )
+
+        # build the symptoms snapshot
+        if symptom_map is None:
+            symptom_map = self._repository.get_symptom_map(symptoms)
+        symptoms_snapshot: list[dict] = [
+            {"id": sid, "name": name} for sid, name in symptom_map.items()
         ]
 
         # build the rules trace payload
         rules_trace: list[dict] = [
             {
                 "rule_id": r["rule_id"],
-                "explanation": r.get("explanation", ""),
+                "explanation": r.get("explanation") or "",
             }
-            for r in result.get("rules_fired", [])
+            for r in rules_fired
         ]
 
-        case: PatientCaseModel = PatientCaseModel.objects.create(
+        case: PatientCaseModel = PatientCaseModel(
             patient_identifier=patient_id,
             reported_symptoms_snapshot=symptoms_snapshot,
             inferred_results=inferred,
@@ -180,22 +462,84 @@ class DiagnosisService:
         )
 
         # create the inference trace log
-        strategy_label: str = result.get("strategy", "FORWARD_CHAINING")
         confidence_map: dict = {
-            d["disease_name"]: d.get("final_confidence", 0)
-            for d in result.get("diseases", [])
+            d["disease_name"]: d.get("final_confidence", 0) for d in diseases
+        }
+
+        # slim trace payload: everything the diagnosis depended on (matched
+        # symptom ids, scores, rendered explanation) is stored as it was;
+        # only display names are looked up again by get_explanation
+        symptom_ids_by_name: dict[str, int] = {
+            name: sid for sid, name in symptom_map.items()
         }
+        trace_rules: list[dict] = [
+            {
+                "rule_id": r["rule_id"],
+                "ms": [
+                    symptom_ids_by_name[name]
+                    for name in r.get("matched_symptoms", [])
+                    if name in symptom_ids_by_name
+                ],
+                "mr": r.get("match_ratio", r.get("satisfaction_score", 0.0)),
+                "cf": r.get("confidence_factor"),
+                "ex": r.get("explanation") or "",
+            }
+            for r in rules_fired
+        ]
 
-        InferenceTraceModel.objects.create(
-            patient_case=case,
+        trace: InferenceTraceModel = InferenceTraceModel(
             strategy_used=strategy_label,
-            rules_fired=result.get("rules_fired", []),
+            rules_fired=trace_rules,
             confidence_scores_calculated=confidence_map,
-            execution_time_ms=result.get("execution_time_ms", 0),
+            execution_time_ms=execution_time_ms,
         )
+        return case, trace
 
-        logger.info("persisted case %s with inference trace", case.id)
-        return case
+    def _render_missing_explanations(self, rules_fired: list[dict]) -> None:
+        """Fill in the ``explanation`` of records a strategy left unrendered.
+
+        Templates come from the compiled rules, so a warm cache costs no
+        query.  Records are updated in place.
+
+        Args:
+            rules_fired: ``rules_fired`` records of an inference result.
+        """
+        pending: list[dict] = [r for r in rules_fired if r.get("explanation") is None]
+        if not pending:
+            return
+
+        rules: dict[int, CompiledRule] = {
+            rule.id: rule for rule in self._repository.get_compiled_rules()
+        }
+        for record in pending:
+            rule: CompiledRule | None = rules.get(record["rule_id"])
+            if rule is None:
+                continue
+            record["explanation"] = compile_explanation_template(rule.explanation_template)(
+                symptoms=", ".join(record.get("matched_symptoms", [])),
+                disease=rule.disease_name,
+            )
+
+    @staticmethod
+    def _build_result_rows(case: PatientCaseModel) -> list[PatientCaseResultModel]:
+        """Build the unsaved result rows mirroring a saved case's inferred results.
+
+        Args:
+            case: A :class:`PatientCaseModel` that already has a primary key.
+
+        Returns:
+            One :class:`PatientCaseResultModel` per inferred disease, ranked
+            in ``inferred_results`` order.
+        """
+        return [
+            PatientCaseResultModel(
+                case=case,
+                disease_id=result["disease_id"],
+                confidence=result["final_confidence"],
+                rank=rank,
+            )
+            for rank, result in enumerate(case.inferred_results)
+        ]
 
     def get_explanation(self, case_id: int) -> str:
         """Retrieve and format the explanation for a completed case.
@@ -231,11 +575,30 @@ class DiagnosisService:
                 details={"case_id": case_id},
             )
 
+        return self.explain_case(case, trace)
+
+    def explain_case(
+        self, case: PatientCaseModel, trace: InferenceTraceModel
+    ) -> str:
+        """Format the explanation for an already-loaded case and trace.
+
+        Used by :meth:`get_explanation`, and directly by callers that
+        have fetched the case and its latest trace themselves.
+
+        Args:
+            case: The :class:`PatientCaseModel` to explain.
+            trace: Its latest :class:`InferenceTraceModel`.
+
+        Returns:
+            Human-readable explanation string.
+        """
         # reconstruct a result dict from the persisted data
         reconstructed: dict = {
             "strategy": trace.strategy_used,
             "diseases": case.inferred_results,
-            "rules_fired": trace.rules_fired,
+            "rules_fired": self._rehydrate_rules(
+                trace.rules_fired, case.reported_symptoms_snapshot
+            ),
             "execution_time_ms": trace.execution_time_ms,
             "total_rules_evaluated": len(trace.rules_fired),
         }
@@ -251,3 +614,82 @@ class DiagnosisService:
         body: str = self._strategy.explain_result(reconstructed)
 
         return f"{header}\n{body}"
+
+    def _rehydrate_rules(
+        self, trace_rules: list[dict], symptoms_snapshot: list[dict]
+    ) -> list[dict]:
+        """Expand slim trace records back into full ``rules_fired`` records.
+
+        Scores, matched symptoms and explanations come from the trace
+        itself, so past cases read the same after the rules are edited
+        or deleted.  Only the rule and disease names are looked up in
+        the current compiled rules.  Records written before traces were
+        slimmed already carry ``rule_name`` and are returned unchanged.
+
+        Args:
+            trace_rules: ``InferenceTraceModel.rules_fired`` payload.
+            symptoms_snapshot: The case's ``reported_symptoms_snapshot``.
+
+        Returns:
+            List of dicts with ``rule_id``, ``rule_name``,
+            ``matched_symptoms``, ``disease_name``, ``match_ratio``,
+            ``satisfaction_score``, ``confidence_factor``,
+            ``final_confidence`` and ``explanation``.
+        """
+        if not trace_rules or "rule_name" in trace_rules[0]:
+            return trace_rules
+
+        rules: dict[int, CompiledRule] = {
+            rule.id: rule for rule in self._repository.get_compiled_rules()
+        }
+        # names as reported at diagnosis time
+        symptom_names: dict[int, str] = {s["id"]: s["name"] for s in symptoms_snapshot}
+
+        records: list[dict] = []
+        for entry in trace_rules:
+            rule: CompiledRule | None = rules.get(entry["rule_id"])
+            ratio: float = entry.get("mr") or 0.0
+            cf: int = entry.get("cf") or 0
+            matched_ids: list[int] | None = entry.get("ms")
+            explanation: str = entry.get("ex", "")
+            if matched_ids is None and rule is not None:
+                # slim records predating "ms" / "ex": best effort from the
+                # current rule
+                matched_ids = [sid for sid in symptom_names if sid in rule.symptom_ids]
+                explanation = compile_explanation_template(rule.explanation_template)(
+                    symptoms=", ".join(symptom_names[sid] for sid in matched_ids),
+                    disease=rule.disease_name,
+                )
+            records.append({
+                "rule_id": entry["rule_id"],
+                "rule_name": (
+                    rule.name if rule is not None
+                    else f"rule {entry['rule_id']} (deleted)"
+                ),
+                "matched_symptoms": [
+                    symptom_names[sid] for sid in matched_ids or ()
+                    if sid in symptom_names
+                ],
+                "disease_name": rule.disease_name if rule is not None else "",
+                "match_ratio": ratio,
+                "satisfaction_score": ratio,
+                "confidence_factor": entry.get("cf"),
+                "final_confidence": ratio * cf / 100,
+                "explanation": explanation,
+            })
+        return records
+
+
+def _bulk_batch_size() -> int:
+    """Return the ``bulk_create`` batch size for the default database.
+
+    ``settings.BULK_CREATE_BATCH_SIZE`` wins when set.  Otherwise
+    PostgreSQL uses 1000 rows per ``INSERT``, where larger batches stop
+    paying off, and other backends use 10000.  Django still lowers the
+    batch to the backend's own limit, such as SQLite's bound-parameter
+    cap.
+    """
+    configured: int | None = getattr(settings, "BULK_CREATE_BATCH_SIZE", None)
+    if configured:
+        return configured
+    return 1000 if connection.vendor == "postgresql" else 10000
@@ -4,9 +4,10 @@ inference_engine/services/forward_chaining.py
 Data-driven **forward chaining** inference strategy.
 
 Algorithm:
-    1. Load all diagnostic rules (prefetch symptoms for performance).
+    1. Load all diagnostic rules (compiled once per knowledge base version).
     2. For each rule, compute how many of its required symptoms the
-       patient has reported.
+       patient has reported (integer bitmasks, or a sparse rule x symptom
+       product in NumPy for large rule sets).
     3. Keep rules where at least one required symptom matches.
     4. Score each rule:  ``match_ratio * (confidence_factor / 100)``.
     5. Aggregate scores per disease and rank descending.
@@ -14,22 +15,135 @@ Algorithm:
 
 from __future__ import annotations
 
+import copy
 import logging
 import time
+from functools import partial
+from itertools import chain
 from typing import Any
 
+import numpy as np
+from django.conf import settings
 from django.db import DatabaseError
-from django.db.models import QuerySet
 
-from knowledge_base.models import DiagnosticRuleModel, SymptomModel
+from knowledge_base.models import compile_explanation_template
 
 from .base_strategy import InferenceStrategy
 from .exceptions import InferenceEngineError, NoMatchingRuleError
-from .knowledge_base_repository import KnowledgeBaseRepository
+from .knowledge_base_repository import (
+    CompiledRule,
+    KnowledgeBaseRepository,
+    RuleMatrix,
+    get_kb_version,
+)
+from .result_memo import ResultMemo
 
 logger: logging.Logger = logging.getLogger(__name__)
 
 
+# memo of results keyed by (kb version, sorted symptom ids), per strategy
+# instance; entries from older versions are never looked up again and age
+# out, and none is served for longer than the ttl
+_RESULT_CACHE_SIZE: int = 4096
+_RESULT_CACHE_TTL: float = 60.0
+
+# below this many rules the per-rule bitmask loop beats numpy's
+# fixed per-call overhead
+_VECTORISE_MIN_RULES: int = 256
+
+
+def _score_bitmask(
+    matrix: RuleMatrix, symptom_bits: dict[int, int], query_mask: int
+) -> tuple[list[tuple[int, float, float]], list[tuple[int, str, float]]]:
+    """Score candidate rules one by one with integer bitmasks.
+
+    Only rules sharing at least one symptom with the patient are
+    visited, via the matrix's inverted index.
+
+    Args:
+        matrix: Compiled rule matrix.
+        symptom_bits: The patient's known symptom ids -> column bit.
+        query_mask: Bitmask of the patient's symptoms (matrix columns).
+
+    Returns:
+        Tuple of ``(fired, ranking)``: ``(rule index, match ratio,
+        confidence)`` for every fired rule in rule order, and
+        ``(disease id, disease name, max confidence)`` per disease with
+        a fired rule, confidence descending then disease id.
+    """
+    fired: list[tuple[int, float, float]] = []
+    best: dict[int, tuple[str, float]] = {}
+
+    candidates: set[int] = set(
+        chain.from_iterable(matrix.inverted[sid] for sid in symptom_bits)
+    )
+    # sorted so fired rules keep the compiled (name) order
+    for idx in sorted(candidates):
+        rule: CompiledRule = matrix.rules[idx]
+        matched_mask: int = matrix.masks[idx] & query_mask
+
+        match_ratio: float = matched_mask.bit_count() / rule.num_required
+        confidence: float = match_ratio * (rule.cf / 100)
+        fired.append((idx, match_ratio, confidence))
+
+        current: tuple[str, float] | None = best.get(rule.disease_id)
+        if current is None or confidence > current[1]:
+            best[rule.disease_id] = (rule.disease_name, confidence)
+
+    ranking: list[tuple[int, str, float]] = sorted(
+        ((d_id, name, confidence) for d_id, (name, confidence) in best.items()),
+        key=lambda d: (-d[2], d[0]),
+    )
+    return fired, ranking
+
+
+def _score_vectorised(
+    matrix: RuleMatrix, symptom_bits: dict[int, int]
+) -> tuple[list[tuple[int, float, float]], list[tuple[int, str, float]]]:
+    """Score every rule at once with NumPy.
+
+    Same contract as :func:`_score_bitmask`; ``symptom_bits`` maps the
+    patient's known symptom ids to their column bit.
+    """
+    # per-rule intersection counts |S ∩ R| in one pass over the non-zero
+    # entries, then ratio * cf / 100 for every rule
+    patient: np.ndarray = np.zeros(len(matrix.columns), dtype=np.float64)
+    patient[[bit.bit_length() - 1 for bit in symptom_bits.values()]] = 1.0
+    matches: np.ndarray = np.bincount(
+        matrix.rows, weights=patient[matrix.cols], minlength=len(matrix.rules)
+    )
+    ratios: np.ndarray = np.divide(
+        matches,
+        matrix.required,
+        out=np.zeros_like(matches),
+        where=matrix.required > 0,
+    )
+    confidences: np.ndarray = ratios * matrix.cfs
+
+    # per-disease maximum over the fired rules: rules of a disease are
+    # contiguous in by_disease order, unfired ones count as -1
+    hit: np.ndarray = matches > 0
+    disease_max: np.ndarray = np.maximum.reduceat(
+        np.where(hit, confidences, -1.0)[matrix.by_disease],
+        matrix.group_starts,
+    )
+
+    fired: list[tuple[int, float, float]] = [
+        (idx, float(ratios[idx]), float(confidences[idx]))
+        for idx in np.flatnonzero(hit).tolist()
+    ]
+    ranking: list[tuple[int, str, float]] = []
+    for group in np.argsort(-disease_max, kind="stable").tolist():
+        if disease_max[group] < 0:
+            break
+        ranking.append((
+            int(matrix.group_disease_ids[group]),
+            matrix.rules[matrix.by_disease[matrix.group_starts[group]]].disease_name,
+            float(disease_max[group]),
+        ))
+    return fired, ranking
+
+
 class ForwardChainingStrategy(InferenceStrategy):
     """Forward chaining: fire every rule whose conditions are met.
 
@@ -40,12 +154,17 @@ class ForwardChainingStrategy(InferenceStrategy):
 
     def __init__(self) -> None:
         self.repository: KnowledgeBaseRepository = KnowledgeBaseRepository()
+        self._memo: ResultMemo = ResultMemo(_RESULT_CACHE_SIZE, _RESULT_CACHE_TTL)
 
     def execute_inference(self, symptoms: list[int], **kwargs: Any) -> dict:
         """Run forward chaining against the knowledge base.
 
         Args:
             symptoms: List of symptom primary-key IDs.
+            **kwargs:
+                symptom_map (dict[int, str]): Optional ``{id: name}`` map
+                    of the reported symptoms, as built by
+                    :meth:`KnowledgeBaseRepository.get_symptom_map`.
 
         Returns:
             Dict with structure::
@@ -66,80 +185,117 @@ class ForwardChainingStrategy(InferenceStrategy):
                     "execution_time_ms": int,
                 }
 
+            Ratios and confidences are full-precision floats; rounding
+            is left to whoever formats them for display.
+
+            Results are memoised per knowledge base version and symptom
+            set; ``execution_time_ms`` is the wall-clock time of this
+            call either way.
+
         Raises:
             NoMatchingRuleError: If no rules fire.
             InferenceEngineError: On database or unexpected errors.
         """
         start: float = time.perf_counter()
-        symptom_set: set[int] = set(symptoms)
 
-        try:
-            # fetch all rules with prefetched symptom relations
-            all_rules: QuerySet[DiagnosticRuleModel] = (
-                DiagnosticRuleModel.objects
-                .select_related("then_disease")
-                .prefetch_related("if_symptoms")
-                .all()
-            )
+        # results are a pure function of (kb version, symptom set); callers
+        # get a deep copy so they can annotate it without touching the memo
+        key: tuple[int, tuple[int, ...]] = (
+            get_kb_version(),
+            tuple(sorted(set(symptoms))),
+        )
+        cached, hit = self._memo.get_or_compute(
+            key, partial(self._evaluate, symptoms, **kwargs)
+        )
+        if hit:
+            logger.debug("forward chaining result served from memo")
 
-            rules_fired: list[dict] = []
-            # disease_id -> aggregated data
-            disease_scores: dict[int, dict] = {}
+        result: dict = copy.deepcopy(cached)
+        result["execution_time_ms"] = int((time.perf_counter() - start) * 1000)
+        return result
+
+    def _evaluate(self, symptoms: list[int], **kwargs: Any) -> dict:
+        """Uncached core of :meth:`execute_inference`.
 
-            total_evaluated: int = 0
+        Args:
+            symptoms: List of symptom primary-key IDs.
+            **kwargs: As for :meth:`execute_inference`.
 
-            for rule in all_rules:
-                total_evaluated += 1
+        Returns:
+            The result dict described in :meth:`execute_inference`.
+        """
+        start: float = time.perf_counter()
+        symptom_set: set[int] = set(symptoms)
 
-                # ids required by this rule
-                rule_symptom_ids: set[int] = set(
-                    rule.if_symptoms.values_list("id", flat=True)
-                )
-                matched_ids: set[int] = symptom_set & rule_symptom_ids
+        try:
+            # compiled in-memory rules; only rebuilt after a kb change
+            matrix: RuleMatrix = self.repository.get_rule_matrix()
+            all_rules: list[CompiledRule] = matrix.rules
+
+            # one bit (column) per known symptom; unknown ids cannot match
+            symptom_bits: dict[int, int] = {
+                sid: 1 << matrix.columns[sid]
+                for sid in symptom_set
+                if sid in matrix.columns
+            }
+            query_mask: int = 0
+            for bit in symptom_bits.values():
+                query_mask |= bit
+
+            fired: list[tuple[int, float, float]]
+            ranking: list[tuple[int, str, float]]
+            if len(all_rules) >= _VECTORISE_MIN_RULES:
+                fired, ranking = _score_vectorised(matrix, symptom_bits)
+            else:
+                fired, ranking = _score_bitmask(matrix, symptom_bits, query_mask)
+
+            # names of the reported symptoms, iterated in the model ordering
+            # (category, name); DiagnosisService passes the map it already
+            # built while validating
+            symptom_name_map: dict[int, str] = kwargs.get(
+                "symptom_map"
+            ) or self.repository.get_symptom_map(symptoms)
+
+            # disease_id -> aggregated data, inserted in rank order
+            disease_scores: dict[int, dict] = {
+                d_id: {
+                    "disease_id": d_id,
+                    "disease_name": d_name,
+                    "final_confidence": confidence,
+                    "matching_rules": [],
+                }
+                for d_id, d_name, confidence in ranking
+            }
 
-                if not matched_ids:
-                    continue
+            rules_fired: list[dict] = []
+            fired_rules: dict[int, CompiledRule] = {}
+            total_evaluated: int = len(all_rules)
 
-                # scoring
-                match_ratio: float = len(matched_ids) / len(rule_symptom_ids)
-                final_confidence: float = match_ratio * (rule.confidence_factor / 100)
+            # python-level work only for the rules that actually fired
+            for idx, match_ratio, final_confidence in fired:
+                rule: CompiledRule = all_rules[idx]
+                matched_mask: int = matrix.masks[idx] & query_mask
 
                 # resolve matched symptom names for the explanation
-                matched_symptom_names: list[str] = list(
-                    SymptomModel.objects
-                    .filter(id__in=matched_ids)
-                    .values_list("name", flat=True)
-                )
+                matched_symptom_names: list[str] = [
+                    name
+                    for sid, name in symptom_name_map.items()
+                    if symptom_bits.get(sid, 0) & matched_mask
+                ]
 
                 rule_record: dict = {
                     "rule_id": rule.id,
                     "rule_name": rule.name,
                     "matched_symptoms": matched_symptom_names,
-                    "match_ratio": round(match_ratio, 4),
-                    "confidence_factor": rule.confidence_factor,
-                    "final_confidence": round(final_confidence, 4),
-                    "explanation": rule.explanation_template.format(
-                        symptoms=", ".join(matched_symptom_names),
-                        disease=rule.then_disease.name,
-                    ),
+                    "match_ratio": match_ratio,
+                    "confidence_factor": rule.cf,
+                    "final_confidence": final_confidence,
+                    # filled in below for the top-ranked diseases only
+                    "explanation": None,
                 }
+                fired_rules[rule.id] = rule
                 rules_fired.append(rule_record)
-
-                # aggregate per disease (keep the highest confidence)
-                d_id: int = rule.then_disease.id
-                if d_id not in disease_scores:
-                    disease_scores[d_id] = {
-                        "disease_id": d_id,
-                        "disease_name": rule.then_disease.name,
-                        "final_confidence": final_confidence,
-                        "matching_rules": [rule_record],
-                    }
-                else:
-                    existing = disease_scores[d_id]
-                    existing["matching_rules"].append(rule_record)
-                    # take the max confidence across all rules for this disease
-                    if final_confidence > existing["final_confidence"]:
-                        existing["final_confidence"] = final_confidence
+                disease_scores[rule.disease_id]["matching_rules"].append(rule_record)
 
         except DatabaseError as exc:
             logger.exception("database error during forward chaining")
@@ -152,16 +308,18 @@ class ForwardChainingStrategy(InferenceStrategy):
             logger.warning("no rules fired for symptoms %s", symptoms)
             raise NoMatchingRuleError(symptom_ids=symptoms)
 
-        # rank diseases by confidence descending
-        ranked_diseases: list[dict] = sorted(
-            disease_scores.values(),
-            key=lambda d: d["final_confidence"],
-            reverse=True,
-        )
-
-        # round the top-level confidence for readability
-        for disease in ranked_diseases:
-            disease["final_confidence"] = round(disease["final_confidence"], 4)
+        ranked_diseases: list[dict] = list(disease_scores.values())
+
+        # explanation strings are only built for the diseases that will be
+        # shown; the rest are rendered on demand by explain_result
+        top_n: int = getattr(settings, "INFERENCE_EXPLANATION_TOP_N", 10)
+        for disease in ranked_diseases[:top_n]:
+            for record in disease["matching_rules"]:
+                rule = fired_rules[record["rule_id"]]
+                record["explanation"] = compile_explanation_template(rule.explanation_template)(
+                    symptoms=", ".join(record["matched_symptoms"]),
+                    disease=rule.disease_name,
+                )
 
         elapsed_ms: int = int((time.perf_counter() - start) * 1000)
 
@@ -189,6 +347,8 @@ class ForwardChainingStrategy(InferenceStrategy):
         Returns:
             Multi-line explanation string.
         """
+        diseases: list[dict] = result.get("diseases", [])
+
         lines: list[str] = [
             "=== forward chaining diagnosis report ===",
             f"strategy: {result.get('strategy', 'N/A')}",
@@ -199,15 +359,35 @@ class ForwardChainingStrategy(InferenceStrategy):
             "--- ranked diseases ---",
         ]
 
-        for idx, disease in enumerate(result.get("diseases", []), start=1):
+        # render any explanations execute_inference deferred, with a single
+        # template lookup for all of them
+        pending: list[int] = [
+            rule["rule_id"]
+            for disease in diseases
+            for rule in disease.get("matching_rules", [])
+            if rule.get("explanation") is None
+        ]
+        templates: dict[int, str] = (
+            self.repository.get_explanation_templates(pending) if pending else {}
+        )
+
+        for idx, disease in enumerate(diseases, start=1):
             confidence_pct: float = disease["final_confidence"] * 100
             lines.append(
                 f"{idx}. {disease['disease_name']} "
                 f"(confidence: {confidence_pct:.1f}%)"
             )
             for rule in disease.get("matching_rules", []):
+                explanation: str | None = rule.get("explanation")
+                if explanation is None:
+                    explanation = compile_explanation_template(
+                        templates.get(rule["rule_id"], "")
+                    )(
+                        symptoms=", ".join(rule["matched_symptoms"]),
+                        disease=disease["disease_name"],
+                    )
                 lines.append(f"   - rule: {rule['rule_name']}")
                 lines.append(f"     matched symptoms: {', '.join(rule['matched_symptoms'])}")
-                lines.append(f"     explanation: {rule['explanation']}")
+                lines.append(f"     explanation: {explanation}")
 
         return "\n".join(lines)
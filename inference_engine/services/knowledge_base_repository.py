@@ -12,19 +12,127 @@ querysets themselves.
 from __future__ import annotations
 
 import logging
-from typing import Optional
+import time
+from collections import defaultdict
+from typing import NamedTuple, Optional
 
-from django.core.cache import cache
-from django.db.models import QuerySet
+import numpy as np
+from django.core.cache import cache, caches
+from django.db.models import F, QuerySet
 
 from knowledge_base.models import DiagnosticRuleModel, SymptomModel
 
 logger: logging.Logger = logging.getLogger(__name__)
 
-# cache key and ttl for the full symptom list
+# cache key prefix (suffixed with the kb version) and ttl for the full
+# symptom list
 _SYMPTOM_CACHE_KEY: str = "kb:all_symptoms"
 _SYMPTOM_CACHE_TTL: int = 300  # 5 minutes
 
+# knowledge base version, bumped on every symptom / disease / rule change
+# (see inference_engine.signals).  It lives alone in the "kb" cache, which
+# every worker must share; values are nanosecond timestamps, so a version
+# that is lost (evicted, cache cleared) is replaced by a newer one and can
+# never fall back to a value older caches were keyed on
+_KB_VERSION_CACHE_ALIAS: str = "kb"
+_KB_VERSION_CACHE_KEY: str = "kb:version"
+
+# per-disease rule caches; keys embed the kb version, so a bump makes
+# stale entries unreachable and the ttl only bounds their lifetime
+_RULES_CACHE_TTL: int = 3600  # 1 hour
+
+
+class CompiledRule(NamedTuple):
+    """Immutable, DB-free snapshot of a diagnostic rule."""
+
+    id: int
+    name: str
+    disease_id: int
+    disease_name: str
+    cf: int
+    symptom_ids: frozenset[int]
+    num_required: int
+    explanation_template: str
+
+
+class RuleMatrix(NamedTuple):
+    """Sparse rule x symptom incidence built from the compiled rules.
+
+    Entry ``k`` of ``rows`` / ``cols`` says rule ``rows[k]`` (an index
+    into ``rules``) requires the symptom in column ``cols[k]``.
+    ``by_disease`` is a stable permutation of the rule indices that makes
+    each disease's rules contiguous; group ``g`` starts at
+    ``group_starts[g]`` in that order and concludes ``group_disease_ids[g]``.
+    ``masks[i]`` has bit ``c`` set when rule ``i`` requires column ``c``
+    and ``inverted`` maps a symptom PK to the (ascending) indices of the
+    rules requiring it.
+    """
+
+    rules: list[CompiledRule]
+    columns: dict[int, int]  # symptom PK -> column index
+    rows: np.ndarray
+    cols: np.ndarray
+    required: np.ndarray  # symptoms required per rule (float64)
+    cfs: np.ndarray  # confidence_factor / 100 per rule (float64)
+    by_disease: np.ndarray
+    group_starts: np.ndarray
+    group_disease_ids: np.ndarray
+    masks: list[int]
+    inverted: dict[int, list[int]]
+
+
+# in-process compiled rule set, keyed by the kb version it was built from
+# and stamped with its build time; the ttl bounds how stale an entry can
+# get should a version bump not reach this process (e.g. a cache backend
+# that is not shared between workers)
+_LOCAL_CACHE_TTL: float = 60.0
+_RULES_CACHE: dict[int, tuple[float, list[CompiledRule]]] = {}
+_MATRIX_CACHE: dict[int, tuple[float, RuleMatrix]] = {}
+_SYMPTOM_NAMES_CACHE: dict[int, tuple[float, dict[int, str]]] = {}
+
+
+def _local_get(store: dict, version: int):
+    """Return the entry ``store`` holds for ``version`` unless it expired."""
+    entry = store.get(version)
+    if entry is None or time.monotonic() - entry[0] > _LOCAL_CACHE_TTL:
+        return None
+    return entry[1]
+
+
+def _local_set(store: dict, version: int, value) -> None:
+    """Make ``value`` the only entry of ``store``, keyed by ``version``."""
+    # only the current version is worth keeping
+    store.clear()
+    store[version] = (time.monotonic(), value)
+
+
+def get_kb_version() -> int:
+    """Return the current knowledge base version.
+
+    Derived caches include this number in their keys so that a single
+    :func:`bump_kb_version` call invalidates all of them at once.
+    """
+    return caches[_KB_VERSION_CACHE_ALIAS].get_or_set(
+        _KB_VERSION_CACHE_KEY, time.time_ns, None
+    )
+
+
+async def aget_kb_version() -> int:
+    """Async variant of :func:`get_kb_version`."""
+    return await caches[_KB_VERSION_CACHE_ALIAS].aget_or_set(
+        _KB_VERSION_CACHE_KEY, time.time_ns, None
+    )
+
+
+def bump_kb_version() -> int:
+    """Advance the knowledge base version and return the new value."""
+    store = caches[_KB_VERSION_CACHE_ALIAS]
+    # strictly newer than the current value even if this host's clock lags
+    version: int = max(time.time_ns(), (store.get(_KB_VERSION_CACHE_KEY) or 0) + 1)
+    store.set(_KB_VERSION_CACHE_KEY, version, None)
+    logger.debug("knowledge base version bumped to %s", version)
+    return version
+
 
 class KnowledgeBaseRepository:
     """Centralised, read-optimised access to the knowledge base.
@@ -34,22 +142,41 @@ class KnowledgeBaseRepository:
     accessed data.
     """
 
-    def get_all_symptoms(self) -> QuerySet[SymptomModel]:
-        """Return all symptoms, served from cache when available.
+    def get_all_symptoms(self) -> list[dict]:
+        """Return all symptoms as plain dicts, served from cache when available.
+
+        The evaluated rows are cached (a cached ``QuerySet`` would just
+        re-run its SQL on every hit) under a key that includes the
+        knowledge base version, so any symptom change is visible at once.
 
         Returns:
-            QuerySet of all :class:`SymptomModel` instances ordered by
-            the model's default ordering (category, name).
+            List of ``{"id", "name", "category", "severity_weight"}``
+            dicts ordered by the model's default ordering (category, name).
         """
-        cached: QuerySet[SymptomModel] | None = cache.get(_SYMPTOM_CACHE_KEY)
+        key: str = f"{_SYMPTOM_CACHE_KEY}:v{get_kb_version()}"
+        cached: list[dict] | None = cache.get(key)
         if cached is not None:
             logger.debug("serving symptoms from cache")
             return cached
 
-        qs: QuerySet[SymptomModel] = SymptomModel.objects.all()
-        cache.set(_SYMPTOM_CACHE_KEY, qs, _SYMPTOM_CACHE_TTL)
+        symptoms: list[dict] = list(
+            SymptomModel.objects.values("id", "name", "category", "severity_weight")
+        )
+        cache.set(key, symptoms, _SYMPTOM_CACHE_TTL)
         logger.debug("symptoms loaded from db and cached for %ss", _SYMPTOM_CACHE_TTL)
-        return qs
+        return symptoms
+
+    def get_all_symptom_instances(self) -> QuerySet[SymptomModel]:
+        """Return all symptoms as model instances (not cached).
+
+        Prefer :meth:`get_all_symptoms` unless model methods or
+        instances are genuinely required.
+
+        Returns:
+            QuerySet of all :class:`SymptomModel` instances ordered by
+            the model's default ordering (category, name).
+        """
+        return SymptomModel.objects.all()
 
     def get_rules_by_disease(
         self, disease_id: int
@@ -63,11 +190,248 @@ class KnowledgeBaseRepository:
             QuerySet of :class:`DiagnosticRuleModel` filtered by
             ``then_disease_id`` with ``if_symptoms`` prefetched.
         """
-        return (
+        # the default manager joins the disease and prefetches symptoms
+        return DiagnosticRuleModel.objects.filter(then_disease_id=disease_id)
+
+    def get_rule_rows_by_disease(
+        self, disease_id: int
+    ) -> tuple[list[dict], dict[int, str]]:
+        """Return a disease's rules as plain dicts plus their symptom names.
+
+        Uses ``values()`` rows and the M2M through table instead of
+        model instances, so callers iterate plain dicts and ints with
+        no descriptor or lazy-loading overhead.  Two queries in total.
+
+        Args:
+            disease_id: Primary key of the target disease.
+
+        Returns:
+            Tuple of ``(rules, symptom_names)``.  ``symptom_names`` maps
+            every required symptom PK to its name and is ordered like
+            :class:`SymptomModel` (category, name); a symptom's position
+            in that order is its bit in the rule masks.  Each rule dict
+            has the keys ``id``, ``name``, ``confidence_factor``,
+            ``explanation_template``, ``disease_name``,
+            ``required_mask`` (``int`` bitmask of required symptoms) and
+            ``required_count``.
+            Both are cached per knowledge base version.
+        """
+        key: str = f"rules:v{get_kb_version()}:d{disease_id}:rows"
+        cached: tuple[list[dict], dict[int, str]] | None = cache.get(key)
+        if cached is not None:
+            logger.debug("serving rule rows for disease %s from cache", disease_id)
+            return cached
+
+        rules: list[dict] = list(
             DiagnosticRuleModel.objects
             .filter(then_disease_id=disease_id)
-            .select_related("then_disease")
-            .prefetch_related("if_symptoms")
+            .values(
+                "id",
+                "name",
+                "confidence_factor",
+                "explanation_template",
+                disease_name=F("then_disease__name"),
+            )
+        )
+        if not rules:
+            cache.set(key, ([], {}), _RULES_CACHE_TTL)
+            return [], {}
+
+        required: dict[int, list[int]] = {rule["id"]: [] for rule in rules}
+        symptom_names: dict[int, str] = {}
+        links = (
+            DiagnosticRuleModel.if_symptoms.through.objects
+            .filter(diagnosticrulemodel_id__in=required)
+            .order_by("symptommodel__category", "symptommodel__name")
+            .values_list("diagnosticrulemodel_id", "symptommodel_id", "symptommodel__name")
+        )
+        for rule_id, symptom_id, symptom_name in links:
+            required[rule_id].append(symptom_id)
+            symptom_names[symptom_id] = symptom_name
+
+        bits: dict[int, int] = {sid: pos for pos, sid in enumerate(symptom_names)}
+        for rule in rules:
+            mask: int = 0
+            for symptom_id in required[rule["id"]]:
+                mask |= 1 << bits[symptom_id]
+            rule["required_mask"] = mask
+            rule["required_count"] = len(required[rule["id"]])
+        cache.set(key, (rules, symptom_names), _RULES_CACHE_TTL)
+        return rules, symptom_names
+
+    def get_compiled_rules(self) -> list[CompiledRule]:
+        """Return every diagnostic rule as a :class:`CompiledRule`.
+
+        The list is built with two queries (rule rows and the M2M
+        through table) and kept in process memory until the knowledge
+        base version changes (or for at most ``_LOCAL_CACHE_TTL``
+        seconds), so repeated inference runs rarely touch the database
+        for rules at all.
+
+        Returns:
+            List of :class:`CompiledRule` in the model ordering (name).
+        """
+        version: int = get_kb_version()
+        compiled: list[CompiledRule] | None = _local_get(_RULES_CACHE, version)
+        if compiled is not None:
+            return compiled
+
+        # both queries select only the columns compiled below, as plain
+        # rows: no wide disease/symptom columns and no model instances
+        required: dict[int, set[int]] = {}
+        links = DiagnosticRuleModel.if_symptoms.through.objects.values_list(
+            "diagnosticrulemodel_id", "symptommodel_id"
+        )
+        for rule_id, symptom_id in links:
+            required.setdefault(rule_id, set()).add(symptom_id)
+
+        compiled = [
+            CompiledRule(
+                id=row["id"],
+                name=row["name"],
+                disease_id=row["then_disease_id"],
+                disease_name=row["disease_name"],
+                cf=row["confidence_factor"],
+                symptom_ids=frozenset(required.get(row["id"], ())),
+                num_required=len(required.get(row["id"], ())),
+                explanation_template=row["explanation_template"],
+            )
+            for row in DiagnosticRuleModel.objects.values(
+                "id",
+                "name",
+                "then_disease_id",
+                "confidence_factor",
+                "explanation_template",
+                disease_name=F("then_disease__name"),
+            )
+        ]
+
+        _local_set(_RULES_CACHE, version, compiled)
+        logger.debug("compiled %d rules for kb version %s", len(compiled), version)
+        return compiled
+
+    def get_symptom_names(self) -> dict[int, str]:
+        """Return a ``{symptom PK: name}`` map of every symptom.
+
+        The map follows the model ordering (category, name) and is kept
+        in process memory per knowledge base version, for at most
+        ``_LOCAL_CACHE_TTL`` seconds.
+        """
+        version: int = get_kb_version()
+        names: dict[int, str] | None = _local_get(_SYMPTOM_NAMES_CACHE, version)
+        if names is None:
+            names = dict(SymptomModel.objects.values_list("id", "name"))
+            _local_set(_SYMPTOM_NAMES_CACHE, version, names)
+        return names
+
+    async def aget_symptom_names(self) -> dict[int, str]:
+        """Async variant of :meth:`get_symptom_names`."""
+        version: int = await aget_kb_version()
+        names: dict[int, str] | None = _local_get(_SYMPTOM_NAMES_CACHE, version)
+        if names is None:
+            names = {
+                sid: name
+                async for sid, name in SymptomModel.objects.values_list("id", "name")
+            }
+            _local_set(_SYMPTOM_NAMES_CACHE, version, names)
+        return names
+
+    async def aget_symptom_map(self, symptom_ids: list[int]) -> dict[int, str]:
+        """Async variant of :meth:`get_symptom_map`."""
+        wanted: set[int] = set(symptom_ids)
+        return {
+            sid: name
+            for sid, name in (await self.aget_symptom_names()).items()
+            if sid in wanted
+        }
+
+    def get_symptom_map(self, symptom_ids: list[int]) -> dict[int, str]:
+        """Return ``{symptom PK: name}`` for the given IDs that exist.
+
+        Served from :meth:`get_symptom_names`, so it costs no query on a
+        warm cache.  IDs that do not exist are simply absent.
+
+        Args:
+            symptom_ids: Symptom PKs to look up.
+
+        Returns:
+            Dict ordered like :class:`SymptomModel` (category, name).
+        """
+        wanted: set[int] = set(symptom_ids)
+        return {
+            sid: name
+            for sid, name in self.get_symptom_names().items()
+            if sid in wanted
+        }
+
+    def get_rule_matrix(self) -> RuleMatrix:
+        """Return the compiled rules together with their incidence arrays.
+
+        Cached in process memory per knowledge base version, like
+        :meth:`get_compiled_rules`.
+
+        Returns:
+            A :class:`RuleMatrix` whose ``rules`` line up with its rows.
+        """
+        version: int = get_kb_version()
+        matrix: RuleMatrix | None = _local_get(_MATRIX_CACHE, version)
+        if matrix is not None:
+            return matrix
+
+        rules: list[CompiledRule] = self.get_compiled_rules()
+        columns: dict[int, int] = {}
+        rows: list[int] = []
+        cols: list[int] = []
+        masks: list[int] = []
+        inverted: dict[int, list[int]] = defaultdict(list)
+        for idx, rule in enumerate(rules):
+            mask: int = 0
+            for symptom_id in rule.symptom_ids:
+                col: int = columns.setdefault(symptom_id, len(columns))
+                rows.append(idx)
+                cols.append(col)
+                mask |= 1 << col
+                inverted[symptom_id].append(idx)
+            masks.append(mask)
+
+        disease_ids: np.ndarray = np.array(
+            [r.disease_id for r in rules], dtype=np.int64
+        )
+        by_disease: np.ndarray = np.argsort(disease_ids, kind="stable")
+        group_disease_ids, group_starts = np.unique(
+            disease_ids[by_disease], return_index=True
+        )
+
+        matrix = RuleMatrix(
+            rules=rules,
+            columns=columns,
+            rows=np.array(rows, dtype=np.intp),
+            cols=np.array(cols, dtype=np.intp),
+            required=np.array([r.num_required for r in rules], dtype=np.float64),
+            cfs=np.array([r.cf / 100 for r in rules], dtype=np.float64),
+            by_disease=by_disease,
+            group_starts=group_starts,
+            group_disease_ids=group_disease_ids,
+            masks=masks,
+            inverted=dict(inverted),
+        )
+        _local_set(_MATRIX_CACHE, version, matrix)
+        return matrix
+
+    def get_explanation_templates(self, rule_ids: list[int]) -> dict[int, str]:
+        """Return the explanation templates of the given rules.
+
+        Args:
+            rule_ids: Primary keys of the rules.
+
+        Returns:
+            Dict mapping rule PK to its ``explanation_template``; rules
+            that no longer exist are simply absent.
+        """
+        return dict(
+            DiagnosticRuleModel.objects
+            .filter(id__in=rule_ids)
+            .values_list("id", "explanation_template")
         )
 
     def get_rule_by_id(self, rule_id: int) -> Optional[DiagnosticRuleModel]:
@@ -81,12 +445,8 @@ class KnowledgeBaseRepository:
             if not found.
         """
         try:
-            return (
-                DiagnosticRuleModel.objects
-                .select_related("then_disease")
-                .prefetch_related("if_symptoms")
-                .get(pk=rule_id)
-            )
+            # the default manager joins the disease and prefetches symptoms
+            return DiagnosticRuleModel.objects.get(pk=rule_id)
         except DiagnosticRuleModel.DoesNotExist:
             logger.warning("rule id %s not found", rule_id)
             return None
@@ -102,16 +462,16 @@ class KnowledgeBaseRepository:
         Returns:
             Tuple of ``(all_exist, missing_ids)`` where
             ``all_exist`` is ``True`` when every ID was found and
-            ``missing_ids`` lists those that were not.
+            ``missing_ids`` lists those that were not (deduplicated,
+            ascending).
         """
+        requested: set[int] = set(symptom_ids)
         existing_ids: set[int] = set(
             SymptomModel.objects
-            .filter(id__in=symptom_ids)
+            .filter(id__in=requested)
             .values_list("id", flat=True)
         )
-        missing: list[int] = [
-            sid for sid in symptom_ids if sid not in existing_ids
-        ]
+        missing: list[int] = sorted(requested - existing_ids)
 
         if missing:
             logger.warning("symptom ids not found in knowledge base: %s", missing)
@@ -0,0 +1,63 @@
+"""
+inference_engine/services/result_memo.py
+========================================
+Bounded, expiring memo for inference results.
+
+Strategies key their results on the knowledge base version plus the
+inputs, so a version bump makes older entries unreachable; the ttl
+bounds how long any entry can be served should a bump not reach this
+process.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class ResultMemo:
+    """Thread-safe LRU memo whose entries also expire after ``ttl`` seconds.
+
+    Args:
+        maxsize: Number of entries kept; the least recently used are
+            dropped first.
+        ttl: Seconds an entry may be served after it was computed.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize: int = maxsize
+        self.ttl: float = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, dict]] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], dict]) -> tuple[dict, bool]:
+        """Return the memoised value for ``key``, computing it when needed.
+
+        ``compute`` runs outside the lock, so concurrent misses on the
+        same key may both compute; the last one to finish is kept.
+
+        Returns:
+            Tuple of ``(value, hit)``.  ``value`` is shared with the
+            memo and must not be mutated.
+        """
+        now: float = time.monotonic()
+        with self._lock:
+            entry: tuple[float, dict] | None = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                return entry[1], True
+
+        value: dict = compute()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value, False
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,51 @@
+"""
+inference_engine/signals.py
+===========================
+Signal receivers that keep the inference engine's caches coherent
+with the knowledge base.
+
+Any write to a symptom, disease or diagnostic rule (including changes
+to a rule's ``if_symptoms``) bumps the knowledge base version, which
+every derived cache includes in its key.  The bump is deferred until
+the surrounding transaction commits, so a concurrent reader can never
+rebuild a cache from the old rows under the new version number.
+"""
+
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from knowledge_base.models import DiagnosticRuleModel, DiseaseModel, SymptomModel
+
+from .services.knowledge_base_repository import bump_kb_version
+
+
+def invalidate_on_kb_write(sender: type, **kwargs) -> None:
+    """Bump the knowledge base version when a KB model row changes."""
+    transaction.on_commit(bump_kb_version, using=kwargs.get("using"))
+
+
+for _model in (SymptomModel, DiseaseModel, DiagnosticRuleModel):
+    post_save.connect(
+        invalidate_on_kb_write,
+        sender=_model,
+        dispatch_uid=f"kb_version_post_save_{_model.__name__}",
+    )
+    post_delete.connect(
+        invalidate_on_kb_write,
+        sender=_model,
+        dispatch_uid=f"kb_version_post_delete_{_model.__name__}",
+    )
+
+
+@receiver(
+    m2m_changed,
+    sender=DiagnosticRuleModel.if_symptoms.through,
+    dispatch_uid="kb_version_rule_symptoms_changed",
+)
+def invalidate_on_rule_symptoms_change(sender: type, action: str, **kwargs) -> None:
+    """Bump the knowledge base version when a rule's symptoms change."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(bump_kb_version, using=kwargs.get("using"))
@@ -1,3 +1,290 @@
-from django.test import TestCase
+from django.core.cache import caches
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from explanations.models import InferenceTraceModel
+from knowledge_base.models import DiagnosticRuleModel, DiseaseModel, SymptomModel
+from patient_cases.models import PatientCaseModel
+
+from .services.backward_chaining import BackwardChainingStrategy
+from .services.diagnosis_service import DiagnosisService, _bulk_batch_size
+from .services.forward_chaining import ForwardChainingStrategy
+from .services.knowledge_base_repository import bump_kb_version, get_kb_version
+
+LOCMEM_CACHES: dict = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "kb": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "kb",
+    },
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class KnowledgeBaseVersionTests(TestCase):
+    def test_bump_advances_version(self):
+        before = get_kb_version()
+        self.assertGreater(bump_kb_version(), before)
+        self.assertGreater(get_kb_version(), before)
+
+    def test_lost_version_never_regresses(self):
+        bumped = bump_kb_version()
+        caches["kb"].clear()
+        self.assertGreater(get_kb_version(), bumped)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedResultInvalidationTests(TestCase):
+    """Edits to the knowledge base must reach memoised inference results."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fever = SymptomModel.objects.create(name="Fever", category="GENERAL")
+        cls.cough = SymptomModel.objects.create(name="Cough", category="RESPIRATORY")
+        cls.flu = DiseaseModel.objects.create(
+            name="Influenza", description="d", treatments="t", urgency_level="MEDIUM"
+        )
+        cls.rule = DiagnosticRuleModel.objects.create(
+            name="FluRule",
+            then_disease=cls.flu,
+            confidence_factor=80,
+            explanation_template="{symptoms} suggest {disease}.",
+        )
+        cls.rule.if_symptoms.set([cls.fever, cls.cough])
+
+    def setUp(self):
+        # a fresh kb version: rolled-back edits from other tests never bump it
+        caches["kb"].clear()
+        self.forward = ForwardChainingStrategy()
+        self.backward = BackwardChainingStrategy()
+
+    def _forward(self) -> dict:
+        return self.forward.execute_inference([self.fever.id, self.cough.id])
+
+    def _backward(self) -> dict:
+        return self.backward.execute_inference(
+            [self.fever.id], target_disease_id=self.flu.id
+        )
+
+    def test_rule_edit_invalidates_results(self):
+        self.assertEqual(self._forward()["rules_fired"][0]["rule_name"], "FluRule")
+        self.assertEqual(self._backward()["rules_evaluated"][0]["rule_name"], "FluRule")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rule.name = "InfluenzaRule"
+            self.rule.confidence_factor = 50
+            self.rule.save()
+
+        forward = self._forward()
+        self.assertEqual(forward["rules_fired"][0]["rule_name"], "InfluenzaRule")
+        self.assertAlmostEqual(forward["diseases"][0]["final_confidence"], 0.5)
+        self.assertEqual(
+            self._backward()["rules_evaluated"][0]["rule_name"], "InfluenzaRule"
+        )
+
+    def test_rule_symptoms_change_invalidates_results(self):
+        self.assertAlmostEqual(self._backward()["best_satisfaction_score"], 0.5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rule.if_symptoms.remove(self.cough)
+
+        self.assertAlmostEqual(self._backward()["best_satisfaction_score"], 1.0)
+        self.assertEqual(
+            self._forward()["rules_fired"][0]["matched_symptoms"], ["Fever"]
+        )
+
+    def test_symptom_rename_invalidates_results(self):
+        self.assertIn("Fever", self._forward()["rules_fired"][0]["matched_symptoms"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fever.name = "Pyrexia"
+            self.fever.save()
+
+        self.assertIn("Pyrexia", self._forward()["rules_fired"][0]["matched_symptoms"])
+        self.assertIn(
+            "Pyrexia", self._backward()["rules_evaluated"][0]["required_symptoms"]
+        )
+
+    def test_disease_rename_invalidates_results(self):
+        self.assertEqual(self._forward()["diseases"][0]["disease_name"], "Influenza")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flu.name = "Flu"
+            self.flu.save()
+
+        self.assertEqual(self._forward()["diseases"][0]["disease_name"], "Flu")
+        self.assertEqual(self._backward()["target_disease_name"], "Flu")
+
+
+@override_settings(CACHES=LOCMEM_CACHES, INFERENCE_EXPLANATION_TOP_N=0)
+class DeferredExplanationTests(TestCase):
+    """Explanations deferred by a strategy are rendered before results leave the service."""
+
+    @classmethod
+    def setUpTestData(cls):
+        fever = SymptomModel.objects.create(name="Fever", category="GENERAL")
+        flu = DiseaseModel.objects.create(
+            name="Influenza", description="d", treatments="t", urgency_level="MEDIUM"
+        )
+        rule = DiagnosticRuleModel.objects.create(
+            name="FluRule",
+            then_disease=flu,
+            confidence_factor=80,
+            explanation_template="{symptoms} suggest {disease}.",
+        )
+        rule.if_symptoms.set([fever])
+        cls.fever = fever
+        cls.flu = flu
+
+    def setUp(self):
+        caches["kb"].clear()
+
+    def test_explanations_rendered_without_trace(self):
+        service = DiagnosisService(ForwardChainingStrategy())
+        result = service.diagnose([self.fever.id], "PT-1", persist_trace=False)
+
+        self.assertEqual(
+            result["rules_fired"][0]["explanation"], "Fever suggest Influenza."
+        )
+        self.assertEqual(
+            result["diseases"][0]["matching_rules"][0]["explanation"],
+            "Fever suggest Influenza.",
+        )
+
+    def test_explanations_rendered_into_trace(self):
+        service = DiagnosisService(ForwardChainingStrategy())
+        result = service.diagnose([self.fever.id], "PT-1", persist_trace=True)
+
+        case = PatientCaseModel.objects.get(pk=result["case_id"])
+        self.assertEqual(
+            case.applied_rules_trace[0]["explanation"], "Fever suggest Influenza."
+        )
+
+    def test_backward_chaining_defers_explanations(self):
+        strategy = BackwardChainingStrategy()
+        result = strategy.execute_inference([self.fever.id], target_disease_id=self.flu.id)
+        self.assertIsNone(result["rules_fired"][0]["explanation"])
+        self.assertIn("FluRule: Fever suggest Influenza.", strategy.explain_result(result))
+
+        persisted = DiagnosisService(strategy).diagnose(
+            [self.fever.id], "PT-1", target_disease_id=self.flu.id
+        )
+        case = PatientCaseModel.objects.get(pk=persisted["case_id"])
+        self.assertEqual(
+            case.applied_rules_trace[0]["explanation"], "Fever suggest Influenza."
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PersistenceRoundTripTests(TestCase):
+    """Diagnoses land in the case row, its result rows and its summary columns."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fever = SymptomModel.objects.create(name="Fever", category="GENERAL")
+        cls.cough = SymptomModel.objects.create(name="Cough", category="RESPIRATORY")
+        cls.flu = DiseaseModel.objects.create(
+            name="Influenza", description="d", treatments="t", urgency_level="MEDIUM"
+        )
+        cls.cold = DiseaseModel.objects.create(
+            name="Common Cold", description="d", treatments="t", urgency_level="LOW"
+        )
+        flu_rule = DiagnosticRuleModel.objects.create(
+            name="FluRule",
+            then_disease=cls.flu,
+            confidence_factor=80,
+            explanation_template="{symptoms} suggest {disease}.",
+        )
+        flu_rule.if_symptoms.set([cls.fever, cls.cough])
+        cold_rule = DiagnosticRuleModel.objects.create(
+            name="ColdRule",
+            then_disease=cls.cold,
+            confidence_factor=40,
+            explanation_template="{symptoms} suggest {disease}.",
+        )
+        cold_rule.if_symptoms.set([cls.cough])
+
+    def setUp(self):
+        caches["kb"].clear()
+        self.service = DiagnosisService(ForwardChainingStrategy())
+
+    def assertCaseMatchesResult(self, case: PatientCaseModel, result: dict):
+        diseases = result["diseases"]
+        self.assertEqual(
+            [row["disease_id"] for row in case.inferred_results],
+            [disease["disease_id"] for disease in diseases],
+        )
+        self.assertEqual(
+            [
+                (row.rank, row.disease_id, row.confidence)
+                for row in case.results.order_by("rank")
+            ],
+            [
+                (rank, disease["disease_id"], disease["final_confidence"])
+                for rank, disease in enumerate(diseases)
+            ],
+        )
+        self.assertEqual(case.symptom_count, len(case.reported_symptoms_snapshot))
+        self.assertEqual(case.top_disease_name, diseases[0]["disease_name"])
+        self.assertEqual(case.top_confidence, diseases[0]["final_confidence"])
+
+    def test_diagnose_round_trip(self):
+        result = self.service.diagnose([self.fever.id, self.cough.id], "PT-1")
+
+        case = PatientCaseModel.objects.get(pk=result["case_id"])
+        self.assertEqual(case.patient_identifier, "PT-1")
+        self.assertEqual(
+            sorted(symptom["name"] for symptom in case.reported_symptoms_snapshot),
+            ["Cough", "Fever"],
+        )
+        self.assertEqual(case.symptom_count, 2)
+        self.assertEqual(case.top_disease_name, "Influenza")
+        self.assertEqual(case.results.count(), 2)
+        self.assertCaseMatchesResult(case, result)
+        self.assertTrue(InferenceTraceModel.objects.filter(patient_case=case).exists())
+
+    def test_diagnose_without_trace_keeps_result_rows(self):
+        result = self.service.diagnose([self.cough.id], "PT-1", persist_trace=False)
+
+        case = PatientCaseModel.objects.get(pk=result["case_id"])
+        self.assertCaseMatchesResult(case, result)
+        self.assertFalse(InferenceTraceModel.objects.filter(patient_case=case).exists())
+
+    @override_settings(BULK_CREATE_BATCH_SIZE=1)
+    def test_diagnose_many_round_trip(self):
+        jobs = [
+            ([self.fever.id, self.cough.id], "PT-1"),
+            ([self.cough.id], "PT-2"),
+            ([self.fever.id, self.cough.id], "PT-3"),
+        ]
+        results = self.service.diagnose_many(jobs)
+
+        self.assertEqual(len(results), 3)
+        for (_, patient_id), result in zip(jobs, results):
+            case = PatientCaseModel.objects.get(pk=result["case_id"])
+            self.assertEqual(case.patient_identifier, patient_id)
+            self.assertCaseMatchesResult(case, result)
+        self.assertEqual(
+            InferenceTraceModel.objects.filter(
+                patient_case_id__in=[result["case_id"] for result in results]
+            ).count(),
+            3,
+        )
+
+    def test_summary_fields_follow_partial_saves(self):
+        result = self.service.diagnose([self.fever.id, self.cough.id], "PT-1")
+        case = PatientCaseModel.objects.get(pk=result["case_id"])
+
+        case.inferred_results = case.inferred_results[1:]
+        case.save(update_fields=["inferred_results"])
+
+        case.refresh_from_db()
+        self.assertEqual(case.top_disease_name, "Common Cold")
+        self.assertEqual(
+            case.top_confidence, case.inferred_results[0]["final_confidence"]
+        )
+
+    def test_bulk_batch_size(self):
+        with override_settings(BULK_CREATE_BATCH_SIZE=250):
+            self.assertEqual(_bulk_batch_size(), 250)
+        with override_settings(BULK_CREATE_BATCH_SIZE=None):
+            self.assertEqual(_bulk_batch_size(), 10000)
@@ -3,11 +3,25 @@ knowledge_base/management/commands/seed_data.py
 ================================================
 Management command to seed the database with initial test data.
 
+The seed data lives only in the ``knowledge_base/fixtures/initial.json``
+fixture.  On an empty knowledge base it is loaded with ``loaddata``; the
+command does nothing when the knowledge base is already seeded.
+``--force``, or a knowledge base that already holds other rows, upserts
+the fixture's records through the ORM instead, matching diseases and
+rules by name so the fixture's primary keys cannot collide with
+existing rows (symptoms keep their fixture IDs, as they always have).
+
 Usage:
     python manage.py seed_data
+    python manage.py seed_data --force
 """
 
+import json
+from pathlib import Path
+
+from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
 from knowledge_base.models import DiagnosticRuleModel, DiseaseModel, SymptomModel
 
@@ -15,80 +29,130 @@ from knowledge_base.models import DiagnosticRuleModel, DiseaseModel, SymptomMode
 class Command(BaseCommand):
     help = "Seed the knowledge base with initial symptoms, diseases, and diagnostic rules."
 
+    FIXTURE: Path = Path(__file__).resolve().parents[2] / "fixtures" / "initial.json"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help=(
+                "Re-seed even if the data is present, upserting through the "
+                "ORM instead of loading the fixture."
+            ),
+        )
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.MIGRATE_HEADING("\n=== Seeding Knowledge Base ===\n"))
 
+        if not self.FIXTURE.exists():
+            raise CommandError(f"Seed fixture not found: {self.FIXTURE}")
+        records: dict[str, list[dict]] = self._read_fixture()
+
+        # warm restarts: two cheap queries instead of a full re-seed
+        if not options["force"] and self._already_seeded(records):
+            self.stdout.write("Already seeded; skipping (use --force to re-seed)")
+            return
+
+        # fast path: loaddata writes the fixture rows in one transaction,
+        # without model validation; only safe while its primary keys are free
+        if not options["force"] and self._knowledge_base_empty():
+            call_command("loaddata", str(self.FIXTURE), verbosity=options["verbosity"])
+        else:
+            # one transaction for the whole seed: a single commit, and a
+            # failed run leaves the knowledge base untouched
+            with transaction.atomic():
+                self._seed(records)
+
         # ------------------------------------------------------------------
-        # 1. Create Symptoms
+        # Summary
         # ------------------------------------------------------------------
-        symptoms_data = [
-            {"id": 1, "name": "Fever", "category": "GENERAL", "severity_weight": 3},
-            {"id": 2, "name": "Cough", "category": "RESPIRATORY", "severity_weight": 2},
-            {"id": 3, "name": "Fatigue", "category": "GENERAL", "severity_weight": 1},
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✔ Seeding complete: "
+                f"{SymptomModel.objects.count()} symptoms, "
+                f"{DiseaseModel.objects.count()} diseases, "
+                f"{DiagnosticRuleModel.objects.count()} rules.\n"
+            )
+        )
+
+    def _read_fixture(self) -> dict[str, list[dict]]:
+        """Return the fixture's records grouped by model label."""
+        records: dict[str, list[dict]] = {
+            "knowledge_base.symptommodel": [],
+            "knowledge_base.diseasemodel": [],
+            "knowledge_base.diagnosticrulemodel": [],
+        }
+        with self.FIXTURE.open(encoding="utf-8") as fixture:
+            for record in json.load(fixture):
+                records.setdefault(record["model"], []).append(record)
+        return records
+
+    @staticmethod
+    def _already_seeded(records: dict[str, list[dict]]) -> bool:
+        """Return ``True`` if every seed symptom and seed disease exist."""
+        symptom_ids: list[int] = [r["pk"] for r in records["knowledge_base.symptommodel"]]
+        disease_names: list[str] = [
+            r["fields"]["name"] for r in records["knowledge_base.diseasemodel"]
         ]
+        return (
+            SymptomModel.objects.filter(id__in=symptom_ids).count() == len(symptom_ids)
+            and DiseaseModel.objects.filter(name__in=disease_names).count()
+            == len(disease_names)
+        )
 
-        created_symptoms = []
-        for data in symptoms_data:
-            symptom, created = SymptomModel.objects.update_or_create(
-                id=data["id"],
-                defaults={
-                    "name": data["name"],
-                    "category": data["category"],
-                    "severity_weight": data["severity_weight"],
-                },
-            )
-            status = "CREATED" if created else "UPDATED"
-            self.stdout.write(f"  [{status}] Symptom: {symptom}")
-            created_symptoms.append(symptom)
+    @staticmethod
+    def _knowledge_base_empty() -> bool:
+        """Return ``True`` if no symptom, disease or rule exists yet."""
+        return not (
+            SymptomModel.objects.exists()
+            or DiseaseModel.objects.exists()
+            or DiagnosticRuleModel.objects.exists()
+        )
 
+    def _seed(self, records: dict[str, list[dict]]) -> None:
+        """Upsert the fixture's symptoms, diseases and rules."""
         # ------------------------------------------------------------------
-        # 2. Create Diseases
+        # 1. Create Symptoms
         # ------------------------------------------------------------------
-        influenza, created = DiseaseModel.objects.update_or_create(
-            name="Influenza",
-            defaults={
-                "description": (
-                    "Influenza (flu) is a contagious respiratory illness caused by "
-                    "influenza viruses. It can cause mild to severe illness and, "
-                    "at times, can lead to death."
-                ),
-                "treatments": (
-                    "Rest, fluids, antiviral medications (oseltamivir/zanamivir). "
-                    "Seek medical attention if symptoms are severe."
-                ),
-                "urgency_level": "MEDIUM",
-            },
+        # one multi-row INSERT ... ON CONFLICT (id) DO UPDATE for all symptoms
+        created_symptoms = SymptomModel.objects.bulk_create(
+            [
+                SymptomModel(id=record["pk"], **record["fields"])
+                for record in records["knowledge_base.symptommodel"]
+            ],
+            update_conflicts=True,
+            update_fields=["name", "category", "severity_weight"],
+            unique_fields=["id"],
         )
-        status = "CREATED" if created else "UPDATED"
-        self.stdout.write(f"  [{status}] Disease: {influenza}")
+        for symptom in created_symptoms:
+            self.stdout.write(f"  [UPSERTED] Symptom: {symptom}")
 
         # ------------------------------------------------------------------
-        # 3. Create Diagnostic Rules
+        # 2. Create Diseases
         # ------------------------------------------------------------------
-        flu_rule, created = DiagnosticRuleModel.objects.update_or_create(
-            name="FluRule",
-            then_disease=influenza,
-            defaults={
-                "confidence_factor": 75,
-                "explanation_template": (
-                    "Patient presents with {symptoms}, which are characteristic "
-                    "symptoms of {disease}."
-                ),
-            },
-        )
-        # Set the M2M relation (symptoms for this rule)
-        flu_rule.if_symptoms.set(created_symptoms)
-        status = "CREATED" if created else "UPDATED"
-        self.stdout.write(f"  [{status}] Rule: {flu_rule}")
+        # fixture disease pk -> the row it was upserted into
+        diseases: dict[int, DiseaseModel] = {}
+        for record in records["knowledge_base.diseasemodel"]:
+            fields: dict = dict(record["fields"])
+            disease, created = DiseaseModel.objects.update_or_create(
+                name=fields.pop("name"), defaults=fields
+            )
+            diseases[record["pk"]] = disease
+            status = "CREATED" if created else "UPDATED"
+            self.stdout.write(f"  [{status}] Disease: {disease}")
 
         # ------------------------------------------------------------------
-        # Summary
+        # 3. Create Diagnostic Rules
         # ------------------------------------------------------------------
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"\n✔ Seeding complete: "
-                f"{SymptomModel.objects.count()} symptoms, "
-                f"{DiseaseModel.objects.count()} diseases, "
-                f"{DiagnosticRuleModel.objects.count()} rules.\n"
+        for record in records["knowledge_base.diagnosticrulemodel"]:
+            fields = dict(record["fields"])
+            if_symptoms: list[int] = fields.pop("if_symptoms")
+            rule, created = DiagnosticRuleModel.objects.update_or_create(
+                name=fields.pop("name"),
+                then_disease=diseases[fields.pop("then_disease")],
+                defaults=fields,
             )
-        )
+            # Set the M2M relation (symptoms for this rule)
+            rule.if_symptoms.set(if_symptoms)
+            status = "CREATED" if created else "UPDATED"
+            self.stdout.write(f"  [{status}] Rule: {rule}")
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.11 on 2026-10-15 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge_base', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='diagnosticrulemodel',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='diagnosticrulemodel',
+            constraint=models.UniqueConstraint(fields=('name', 'then_disease'), name='uniq_rule_name_disease'),
+        ),
+    ]
@@ -4,18 +4,66 @@ knowledge_base/models.py
 Core domain models for the medical knowledge base.
 
 Contains:
+    - compile_explanation_template: Cached renderer for rule explanation
+      templates.
     - SymptomModel: Represents individual medical symptoms with categorisation.
     - DiseaseModel: Represents diseases with treatment info and urgency levels.
+    - DiagnosticRuleManager: Default manager that eager-loads a rule's
+      disease and symptoms.
     - DiagnosticRuleModel: IF-THEN rules mapping symptom sets to diseases
       with confidence factors and explanation templates.
 """
 
 from __future__ import annotations
 
+import string
+from functools import lru_cache
+from typing import Any, Callable
+
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
+_FORMATTER: string.Formatter = string.Formatter()
+
+
+@lru_cache(maxsize=2048)
+def compile_explanation_template(template: str) -> Callable[..., str]:
+    """Pre-parse an explanation template into a render callable.
+
+    ``str.format`` re-parses the template on every call; here the
+    literal/field segments are split once per distinct template and
+    rendering is a plain join.  Templates using anything beyond bare
+    named fields (conversions, format specs, attribute or index access)
+    fall back to ``template.format`` so behaviour is unchanged.
+
+    The cache is keyed on the template text itself, so an edited rule
+    simply compiles to a new entry.
+    """
+    try:
+        parsed = list(_FORMATTER.parse(template))
+    except ValueError:
+        # malformed template: let str.format raise at render time as before
+        return template.format
+
+    if any(
+        field is not None and (spec or conversion or not field.isidentifier())
+        for _, field, spec, conversion in parsed
+    ):
+        return template.format
+
+    segments: tuple[tuple[str, str | None], ...] = tuple(
+        (literal, field) for literal, field, _, _ in parsed
+    )
+
+    def render(**values: Any) -> str:
+        return "".join(
+            literal if field is None else f"{literal}{values[field]}"
+            for literal, field in segments
+        )
+
+    return render
+
 
 class SymptomModel(models.Model):
     """A single medical symptom used as input for diagnostic inference.
@@ -65,7 +113,11 @@ class SymptomModel(models.Model):
     # Dunder methods
     # ------------------------------------------------------------------
     def __str__(self) -> str:
-        return f"{self.name} ({self.get_category_display()})"
+        return f"{self.name} ({_CATEGORY_DISPLAY.get(self.category, self.category)})"
+
+
+# value → label, read directly by __str__ instead of get_FOO_display()
+_CATEGORY_DISPLAY: dict[str, str] = dict(SymptomModel.Category.choices)
 
 
 class DiseaseModel(models.Model):
@@ -118,7 +170,29 @@ class DiseaseModel(models.Model):
     # Dunder methods
     # ------------------------------------------------------------------
     def __str__(self) -> str:
-        return f"{self.name} (Urgency: {self.get_urgency_level_display()})"
+        urgency: str = _URGENCY_DISPLAY.get(self.urgency_level, self.urgency_level)
+        return f"{self.name} (Urgency: {urgency})"
+
+
+_URGENCY_DISPLAY: dict[str, str] = dict(DiseaseModel.UrgencyLevel.choices)
+
+
+class DiagnosticRuleManager(models.Manager):
+    """Manager that eager-loads the relations every rule is rendered with.
+
+    ``__str__`` reads ``then_disease`` and rule listings show
+    ``if_symptoms``, so both are joined / prefetched by default.  Callers
+    that need a different shape can reset them with
+    ``select_related(None)`` / ``prefetch_related(None)``.
+    """
+
+    def get_queryset(self) -> models.QuerySet:
+        return (
+            super()
+            .get_queryset()
+            .select_related("then_disease")
+            .prefetch_related("if_symptoms")
+        )
 
 
 class DiagnosticRuleModel(models.Model):
@@ -169,6 +243,8 @@ class DiagnosticRuleModel(models.Model):
         ),
     )
 
+    objects: DiagnosticRuleManager = DiagnosticRuleManager()
+
     # ------------------------------------------------------------------
     # Validation
     # ------------------------------------------------------------------
@@ -183,7 +259,7 @@ class DiagnosticRuleModel(models.Model):
         """
         super().clean()
         # M2M validation can only run when the instance has a PK
-        if self.pk and self.if_symptoms.count() == 0:
+        if self.pk and not self.if_symptoms.exists():
             raise ValidationError(
                 {"if_symptoms": "A diagnostic rule must have at least one symptom."}
             )
@@ -192,8 +268,16 @@ class DiagnosticRuleModel(models.Model):
     # Meta
     # ------------------------------------------------------------------
     class Meta:
-        unique_together: list[list[str]] = [["name", "then_disease"]]
         ordering: list[str] = ["name"]
+        constraints: list[models.BaseConstraint] = [
+            # its index also serves (name, disease) lookups such as
+            # seed_data's update_or_create.  No INCLUDE columns: SQLite
+            # drops a unique constraint that has them
+            models.UniqueConstraint(
+                fields=["name", "then_disease"],
+                name="uniq_rule_name_disease",
+            ),
+        ]
         verbose_name: str = "Diagnostic Rule"
         verbose_name_plural: str = "Diagnostic Rules"
 
@@ -0,0 +1,32 @@
+"""
+medidiagnose/encoders.py
+========================
+JSON encoders shared by the project's ``JSONField`` columns.
+
+Contains:
+    - OrjsonEncoder: ``DjangoJSONEncoder`` drop-in that serialises with
+      :mod:`orjson`.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+
+# non-str dict keys are stringified like the stdlib encoder does
+_ORJSON_OPTIONS: int = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class OrjsonEncoder(DjangoJSONEncoder):
+    """JSON encoder backed by :mod:`orjson`.
+
+    ``JSONField`` serialises through ``json.dumps(value, cls=encoder)``,
+    which ends in :meth:`encode`; overriding it hands the whole document
+    to orjson.  Values orjson cannot handle natively fall back to
+    :meth:`DjangoJSONEncoder.default` (decimals, durations, lazy strings).
+    """
+
+    def encode(self, o: Any) -> str:
+        return orjson.dumps(o, default=self.default, option=_ORJSON_OPTIONS).decode()
@@ -96,6 +96,21 @@ DATABASES: dict = {
     }
 }
 
+# =============================================================================
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# =============================================================================
+# "kb" holds nothing but the knowledge base version ("kb:version") that
+# invalidates the inference engine's in-process caches, so it must be shared
+# by every worker process; with a single key it never reaches the file
+# cache's cull threshold.  The default file cache is shared between
+# processes on one host, set KB_CACHE_URL (e.g. redis://...) for
+# multi-host deployments
+CACHES: dict = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+    "kb": env.cache("KB_CACHE_URL", default=f"filecache://{BASE_DIR / '.cache' / 'kb'}"),
+}
+
 # =============================================================================
 # Password Validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -147,3 +162,20 @@ REST_FRAMEWORK: dict = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 25,
 }
+
+# =============================================================================
+# Inference Engine
+# =============================================================================
+# forward chaining builds explanation strings for this many top-ranked
+# diseases; the rest are rendered on demand
+INFERENCE_EXPLANATION_TOP_N: int = env.int("INFERENCE_EXPLANATION_TOP_N", default=10)
+
+# batch size used when patient cases / results / traces are bulk-inserted;
+# unset picks a per-backend default (1000 on PostgreSQL, 10000 elsewhere)
+BULK_CREATE_BATCH_SIZE: int | None = env.int("BULK_CREATE_BATCH_SIZE", default=None)
+
+# default for DiagnosisService(persist_trace=...): when False only a minimal
+# patient case is stored and no inference trace is written
+INFERENCE_ENGINE_PERSIST_TRACE: bool = env.bool(
+    "INFERENCE_ENGINE_PERSIST_TRACE", default=True
+)
@@ -6,11 +6,45 @@ Django forms for the patient case symptom checker.
 
 from __future__ import annotations
 
+from collections.abc import Iterator
+
 from django import forms
+from django.utils.choices import BaseChoiceIterator
 
+from inference_engine.services.knowledge_base_repository import KnowledgeBaseRepository
 from knowledge_base.models import SymptomModel
 
 
+class CachedSymptomChoiceIterator(BaseChoiceIterator):
+    """Yield symptom choices from the cached knowledge base symptom rows.
+
+    Stands in for ``ModelChoiceIterator`` so that rendering the form reuses
+    :meth:`KnowledgeBaseRepository.get_all_symptoms` (cached per knowledge
+    base version) instead of running the field's queryset again.
+    """
+
+    def __init__(self, field: forms.ModelMultipleChoiceField) -> None:
+        self.field = field
+
+    def __iter__(self) -> Iterator[tuple[int, str]]:
+        for symptom in KnowledgeBaseRepository().get_all_symptoms():
+            label: str = SymptomModel.Category(symptom["category"]).label
+            yield symptom["id"], f"{symptom['name']} ({label})"
+
+    def __len__(self) -> int:
+        return len(KnowledgeBaseRepository().get_all_symptoms())
+
+
+class CachedSymptomChoiceField(forms.ModelMultipleChoiceField):
+    """``ModelMultipleChoiceField`` whose choices come from the symptom cache.
+
+    Submitted values are still validated against ``queryset``; only the
+    choice list used for rendering is served from cache.
+    """
+
+    iterator = CachedSymptomChoiceIterator
+
+
 class SymptomCheckForm(forms.Form):
     """Form for selecting symptoms in the symptom checker view.
 
@@ -18,7 +52,7 @@ class SymptomCheckForm(forms.Form):
     can select one or more symptoms from the knowledge base.
     """
 
-    symptoms = forms.ModelMultipleChoiceField(
+    symptoms = CachedSymptomChoiceField(
         queryset=SymptomModel.objects.all(),
         widget=forms.CheckboxSelectMultiple(
             attrs={"class": "form-check-input symptom-checkbox"}
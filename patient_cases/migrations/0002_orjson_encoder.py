@@ -0,0 +1,29 @@
+# Generated by Django 5.2.11 on 2026-10-15 17:33
+
+import medidiagnose.encoders
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patient_cases', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='patientcasemodel',
+            name='applied_rules_trace',
+            field=models.JSONField(default=list, encoder=medidiagnose.encoders.OrjsonEncoder, help_text='Trace of rules that fired during inference, e.g. [{"rule_id": 1, "explanation": "..."}].'),
+        ),
+        migrations.AlterField(
+            model_name='patientcasemodel',
+            name='inferred_results',
+            field=models.JSONField(default=list, encoder=medidiagnose.encoders.OrjsonEncoder, help_text='Ranked list of inferred diseases with confidence scores, e.g. [{"disease_id": 1, "disease_name": "Flu", "confidence": 85.0}].'),
+        ),
+        migrations.AlterField(
+            model_name='patientcasemodel',
+            name='reported_symptoms_snapshot',
+            field=models.JSONField(default=list, encoder=medidiagnose.encoders.OrjsonEncoder, help_text='JSON list of symptom dicts, e.g. [{"id": 1, "name": "Fever"}].'),
+        ),
+    ]
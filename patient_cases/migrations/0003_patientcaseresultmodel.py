@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-15 17:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge_base', '0001_initial'),
+        ('patient_cases', '0002_orjson_encoder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientCaseResultModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('confidence', models.FloatField(help_text='Final confidence score of the inferred disease.')),
+                ('rank', models.PositiveSmallIntegerField(help_text="Zero-based rank within the case's inferred results.")),
+                ('case', models.ForeignKey(help_text='Diagnostic session this result belongs to.', on_delete=django.db.models.deletion.CASCADE, related_name='results', to='patient_cases.patientcasemodel')),
+                ('disease', models.ForeignKey(help_text='Inferred disease.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='case_results', to='knowledge_base.diseasemodel')),
+            ],
+            options={
+                'verbose_name': 'Patient Case Result',
+                'verbose_name_plural': 'Patient Case Results',
+                'ordering': ['rank'],
+                'indexes': [models.Index(fields=['case', 'rank'], name='idx_case_result_rank')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.11 on 2026-10-15 17:38
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def populate_case_results(apps, schema_editor):
+    """Copy every case's ``inferred_results`` JSON into result rows."""
+    PatientCaseModel = apps.get_model("patient_cases", "PatientCaseModel")
+    PatientCaseResultModel = apps.get_model("patient_cases", "PatientCaseResultModel")
+    DiseaseModel = apps.get_model("knowledge_base", "DiseaseModel")
+
+    disease_ids = set(DiseaseModel.objects.values_list("id", flat=True))
+    rows = []
+    cases = PatientCaseModel.objects.only("id", "inferred_results")
+    for case in cases.iterator(chunk_size=BATCH_SIZE):
+        for rank, result in enumerate(case.inferred_results or []):
+            disease_id = result.get("disease_id")
+            rows.append(
+                PatientCaseResultModel(
+                    case_id=case.id,
+                    disease_id=disease_id if disease_id in disease_ids else None,
+                    confidence=result.get("final_confidence", 0),
+                    rank=rank,
+                )
+            )
+        if len(rows) >= BATCH_SIZE:
+            PatientCaseResultModel.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+            rows = []
+    PatientCaseResultModel.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+
+def clear_case_results(apps, schema_editor):
+    apps.get_model("patient_cases", "PatientCaseResultModel").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge_base', '0001_initial'),
+        ('patient_cases', '0003_patientcaseresultmodel'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_case_results, clear_case_results),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.11 on 2026-10-15 17:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patient_cases', '0004_populate_case_results'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patientcasemodel',
+            index=models.Index(fields=['-session_date', '-id'], name='idx_case_session_date'),
+        ),
+        migrations.AddIndex(
+            model_name='patientcasemodel',
+            index=models.Index(fields=['patient_identifier'], name='idx_case_patient'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.11 on 2026-10-15 17:40
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def populate_summary_fields(apps, schema_editor):
+    """Fill the summary columns of existing cases from their JSON snapshots."""
+    PatientCaseModel = apps.get_model("patient_cases", "PatientCaseModel")
+
+    cases = PatientCaseModel.objects.only(
+        "id", "reported_symptoms_snapshot", "inferred_results"
+    )
+    batch = []
+    for case in cases.iterator(chunk_size=BATCH_SIZE):
+        top = case.inferred_results[0] if case.inferred_results else {}
+        case.symptom_count = len(case.reported_symptoms_snapshot or [])
+        case.top_disease_name = top.get("disease_name", "")
+        case.top_confidence = top.get("final_confidence")
+        batch.append(case)
+        if len(batch) >= BATCH_SIZE:
+            PatientCaseModel.objects.bulk_update(
+                batch, ["symptom_count", "top_disease_name", "top_confidence"]
+            )
+            batch = []
+    PatientCaseModel.objects.bulk_update(
+        batch, ["symptom_count", "top_disease_name", "top_confidence"]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patient_cases', '0005_case_date_patient_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patientcasemodel',
+            name='symptom_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Number of reported symptoms.'),
+        ),
+        migrations.AddField(
+            model_name='patientcasemodel',
+            name='top_confidence',
+            field=models.FloatField(blank=True, editable=False, help_text='Confidence of the highest-ranked inferred disease.', null=True),
+        ),
+        migrations.AddField(
+            model_name='patientcasemodel',
+            name='top_disease_name',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Name of the highest-ranked inferred disease.', max_length=200),
+        ),
+        migrations.RunPython(populate_summary_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.11 on 2026-10-15 17:42
+
+from django.db import migrations
+
+INDEX_NAME = "case_results_gin"
+TABLE_NAME = "patient_cases_patientcasemodel"
+
+
+def create_gin_index(apps, schema_editor):
+    """Index ``inferred_results`` for ``@>`` containment lookups (PostgreSQL only).
+
+    ``jsonb_path_ops`` gives a smaller index than the default opclass and
+    only serves containment, which is all the disease lookups need.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} "
+        f"ON {TABLE_NAME} USING gin (inferred_results jsonb_path_ops)"
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('patient_cases', '0007_case_summary_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
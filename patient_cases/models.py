@@ -7,12 +7,17 @@ Contains:
     - PatientCaseModel: A single diagnostic session for a patient,
       capturing reported symptoms, inferred results, and the trace
       of rules that fired.
+    - PatientCaseResultModel: One ranked disease of a case's inferred
+      results, stored relationally so it can be joined and indexed.
 """
 
 from __future__ import annotations
 
 from django.db import models
 
+from knowledge_base.models import DiseaseModel
+from medidiagnose.encoders import OrjsonEncoder
+
 
 class PatientCaseModel(models.Model):
     """Records a single patient diagnostic session.
@@ -33,6 +38,11 @@ class PatientCaseModel(models.Model):
             "explanation": str}`` dicts for every rule that fired.
         final_diagnosis_notes: Optional free-text notes added by the
             clinician after reviewing the inference output.
+        symptom_count: Number of reported symptoms (denormalised).
+        top_disease_name: Name of the highest-ranked inferred disease
+            (denormalised).
+        top_confidence: Confidence of the highest-ranked inferred
+            disease (denormalised).
     """
 
     # ------------------------------------------------------------------
@@ -48,10 +58,12 @@ class PatientCaseModel(models.Model):
     )
     reported_symptoms_snapshot = models.JSONField(
         default=list,
+        encoder=OrjsonEncoder,
         help_text='JSON list of symptom dicts, e.g. [{"id": 1, "name": "Fever"}].',
     )
     inferred_results = models.JSONField(
         default=list,
+        encoder=OrjsonEncoder,
         help_text=(
             "Ranked list of inferred diseases with confidence scores, "
             'e.g. [{"disease_id": 1, "disease_name": "Flu", "confidence": 85.0}].'
@@ -59,6 +71,7 @@ class PatientCaseModel(models.Model):
     )
     applied_rules_trace = models.JSONField(
         default=list,
+        encoder=OrjsonEncoder,
         help_text=(
             "Trace of rules that fired during inference, "
             'e.g. [{"rule_id": 1, "explanation": "..."}].'
@@ -70,14 +83,73 @@ class PatientCaseModel(models.Model):
         help_text="Optional clinician notes after reviewing inference results.",
     )
 
+    # summary columns kept in step with the JSON snapshots by save(), so
+    # list pages can skip loading the JSON entirely
+    symptom_count: int = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of reported symptoms.",
+    )
+    top_disease_name: str = models.CharField(
+        max_length=200,
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Name of the highest-ranked inferred disease.",
+    )
+    top_confidence = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Confidence of the highest-ranked inferred disease.",
+    )
+
     # ------------------------------------------------------------------
     # Meta
     # ------------------------------------------------------------------
     class Meta:
         ordering: list[str] = ["-session_date"]
+        indexes: list[models.Index] = [
+            # history pages range-filter by date and seek on the
+            # (session_date, id) cursor; lookups by patient match the
+            # identifier exactly
+            models.Index(
+                fields=["-session_date", "-id"], name="idx_case_session_date"
+            ),
+            models.Index(fields=["patient_identifier"], name="idx_case_patient"),
+            # PostgreSQL also gets a GIN (jsonb_path_ops) index on
+            # inferred_results, created in migration 0008 since it is
+            # not portable to the other backends
+        ]
         verbose_name: str = "Patient Case"
         verbose_name_plural: str = "Patient Cases"
 
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def sync_summary_fields(self) -> None:
+        """Refresh the denormalised summary columns from the JSON snapshots.
+
+        Called by :meth:`save`; callers that insert with ``bulk_create``
+        (which skips ``save``) must call it themselves.
+        """
+        top: dict = self.inferred_results[0] if self.inferred_results else {}
+        self.symptom_count = len(self.reported_symptoms_snapshot)
+        self.top_disease_name = top.get("disease_name", "")
+        self.top_confidence = top.get("final_confidence")
+
+    def save(self, *args, **kwargs) -> None:
+        self.sync_summary_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {
+                *update_fields,
+                "symptom_count",
+                "top_disease_name",
+                "top_confidence",
+            }
+        super().save(*args, **kwargs)
+
     # ------------------------------------------------------------------
     # Dunder methods
     # ------------------------------------------------------------------
@@ -86,3 +158,59 @@ class PatientCaseModel(models.Model):
             self.session_date.strftime("%Y-%m-%d %H:%M") if self.session_date else "N/A"
         )
         return f"Case {self.patient_identifier} – {formatted_date}"
+
+
+class PatientCaseResultModel(models.Model):
+    """A single ranked disease inferred for a :class:`PatientCaseModel`.
+
+    Mirrors one entry of ``PatientCaseModel.inferred_results`` so the
+    result page can join the diseases in one query and cases can be
+    filtered by disease through an index instead of scanning JSON.
+
+    Attributes:
+        case: The diagnostic session this result belongs to.
+        disease: The inferred disease (``NULL`` once the disease is
+            deleted; the case keeps its JSON snapshot).
+        confidence: Final confidence score of the disease.
+        rank: Zero-based position in ``inferred_results``.
+    """
+
+    # ------------------------------------------------------------------
+    # Fields
+    # ------------------------------------------------------------------
+    case: models.ForeignKey = models.ForeignKey(
+        PatientCaseModel,
+        on_delete=models.CASCADE,
+        related_name="results",
+        help_text="Diagnostic session this result belongs to.",
+    )
+    disease: models.ForeignKey = models.ForeignKey(
+        DiseaseModel,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="case_results",
+        help_text="Inferred disease.",
+    )
+    confidence: float = models.FloatField(
+        help_text="Final confidence score of the inferred disease.",
+    )
+    rank: int = models.PositiveSmallIntegerField(
+        help_text="Zero-based rank within the case's inferred results.",
+    )
+
+    # ------------------------------------------------------------------
+    # Meta
+    # ------------------------------------------------------------------
+    class Meta:
+        ordering: list[str] = ["rank"]
+        indexes: list[models.Index] = [
+            models.Index(fields=["case", "rank"], name="idx_case_result_rank"),
+        ]
+        verbose_name: str = "Patient Case Result"
+        verbose_name_plural: str = "Patient Case Results"
+
+    # ------------------------------------------------------------------
+    # Dunder methods
+    # ------------------------------------------------------------------
+    def __str__(self) -> str:
+        return f"#{self.rank + 1} disease {self.disease_id} ({self.confidence})"
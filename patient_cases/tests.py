@@ -1,3 +1,83 @@
-from django.test import TestCase
+from datetime import datetime, timezone
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .models import PatientCaseModel
+
+LOCMEM_CACHES: dict = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "kb": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "kb",
+    },
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CaseHistoryPaginationTests(TestCase):
+    """Keyset pagination of the case history, including tied timestamps."""
+
+    @classmethod
+    def setUpTestData(cls):
+        PatientCaseModel.objects.bulk_create(
+            PatientCaseModel(patient_identifier=f"PT-{n:03d}") for n in range(40)
+        )
+        # every case shares one timestamp, so only the id breaks the ties
+        # across page boundaries
+        PatientCaseModel.objects.update(
+            session_date=datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+        )
+        cls.ordered_ids = list(
+            PatientCaseModel.objects.order_by("-session_date", "-id")
+            .values_list("id", flat=True)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("patient_cases:case-history")
+
+    def _page(self, query: str = ""):
+        response = self.client.get(f"{self.url}?{query}" if query else self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_older_pages_cover_every_case_once(self):
+        seen: list[int] = []
+        context = self._page()
+        while True:
+            seen.extend(case.pk for case in context["cases"])
+            if not context["next_query"]:
+                break
+            context = self._page(context["next_query"])
+
+        self.assertEqual(seen, self.ordered_ids)
+
+    def test_newer_link_returns_the_previous_page(self):
+        first = self._page()
+        second = self._page(first["next_query"])
+        third = self._page(second["next_query"])
+
+        self.assertFalse(first["previous_query"])
+        self.assertEqual(
+            [case.pk for case in self._page(third["previous_query"])["cases"]],
+            [case.pk for case in second["cases"]],
+        )
+        self.assertEqual(
+            [case.pk for case in self._page(second["previous_query"])["cases"]],
+            [case.pk for case in first["cases"]],
+        )
+
+    def test_total_count_is_cached(self):
+        self.assertEqual(self._page()["total_count"], 40)
+
+        PatientCaseModel.objects.create(patient_identifier="PT-NEW")
+        self.assertEqual(self._page()["total_count"], 40)
+
+        cache.clear()
+        self.assertEqual(self._page()["total_count"], 41)
+
+    def test_total_count_is_cached_per_date_range(self):
+        self.assertEqual(self._page()["total_count"], 40)
+        self.assertEqual(self._page("date_from=2026-01-02")["total_count"], 0)
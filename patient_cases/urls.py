@@ -26,4 +26,9 @@ urlpatterns = [
         views.CaseHistoryListView.as_view(),
         name="case-history",
     ),
+    path(
+        "history/export/",
+        views.CaseHistoryExportView.as_view(),
+        name="case-history-export",
+    ),
 ]
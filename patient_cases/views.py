@@ -7,28 +7,83 @@ Contains:
     - SymptomCheckerFormView: Symptom checker form → diagnosis.
     - DiagnosisResultDetailView: Display a single diagnosis case result.
     - CaseHistoryListView: Paginated list of all past cases.
+    - CaseHistoryExportView: Streaming CSV export of the case history.
 """
 
 from __future__ import annotations
 
+import csv
 import logging
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+from itertools import chain, groupby
+from operator import itemgetter
+from urllib.parse import urlencode
 
 from django.contrib import messages
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Prefetch, Q
+from django.http import StreamingHttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.views.generic import DetailView, FormView, ListView
 
+from explanations.models import InferenceTraceModel
 from inference_engine.services.diagnosis_service import DiagnosisService
 from inference_engine.services.exceptions import InferenceEngineError
 from inference_engine.services.forward_chaining import ForwardChainingStrategy
+from inference_engine.services.knowledge_base_repository import KnowledgeBaseRepository
 from knowledge_base.models import SymptomModel
-from explanations.models import InferenceTraceModel
 
 from .forms import SymptomCheckForm
 from .models import PatientCaseModel
 
 logger = logging.getLogger(__name__)
 
+# the history page's total is allowed to lag new cases by this long
+_CASE_COUNT_CACHE_TTL: int = 60
+
+# rows fetched per round trip when streaming the CSV export
+_EXPORT_CHUNK_SIZE: int = 2000
+
+
+@lru_cache(maxsize=1)
+def _diagnosis_service() -> DiagnosisService:
+    """Return the shared forward-chaining service used by these views.
+
+    Created lazily on the first request; the service is stateless, so
+    one instance serves every request.
+    """
+    return DiagnosisService(strategy=ForwardChainingStrategy())
+
+
+def _start_of_day(value: str) -> datetime | None:
+    """Return the aware start of the ``YYYY-MM-DD`` day, or ``None`` if invalid."""
+    try:
+        day = parse_date(value)
+    except ValueError:
+        return None
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _parse_cursor(date: str | None, pk: str | None) -> tuple[datetime, int] | None:
+    """Return the ``(session_date, id)`` keyset cursor, or ``None`` if invalid."""
+    try:
+        cursor_date = parse_datetime(date or "")
+        cursor_id = int(pk or "")
+    except ValueError:
+        return None
+    if cursor_date is None:
+        return None
+    if timezone.is_naive(cursor_date):
+        cursor_date = timezone.make_aware(cursor_date)
+    return cursor_date, cursor_id
+
 
 # ─────────────────────────────────────────────────────────────────────
 # Symptom Checker
@@ -47,25 +102,22 @@ class SymptomCheckerFormView(FormView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Group symptoms by category for the template grid
-        symptoms_by_category = {}
-        for symptom in SymptomModel.objects.all():
-            cat = symptom.get_category_display()
-            if cat not in symptoms_by_category:
-                symptoms_by_category[cat] = []
-            symptoms_by_category[cat].append(symptom)
-        context["symptoms_by_category"] = symptoms_by_category
+        # Group symptoms by category for the template grid; the cached
+        # symptom rows are already ordered by (category, name)
+        symptoms = KnowledgeBaseRepository().get_all_symptoms()
+        context["symptoms_by_category"] = {
+            SymptomModel.Category(cat).label: list(group)
+            for cat, group in groupby(symptoms, key=itemgetter("category"))
+        }
         return context
 
     def form_valid(self, form):
-        symptoms = form.cleaned_data["symptoms"]
         patient_id = form.cleaned_data["patient_id"]
-        symptom_ids = list(symptoms.values_list("id", flat=True))
+        # validation already evaluated the queryset — no second SELECT
+        symptom_ids = [symptom.pk for symptom in form.cleaned_data["symptoms"]]
 
         try:
-            strategy = ForwardChainingStrategy()
-            service = DiagnosisService(strategy=strategy)
-            result = service.diagnose(
+            result = _diagnosis_service().diagnose(
                 symptoms=symptom_ids,
                 patient_id=patient_id,
             )
@@ -80,8 +132,12 @@ class SymptomCheckerFormView(FormView):
         except InferenceEngineError as exc:
             messages.error(self.request, f"Diagnosis failed: {exc.message}")
             return self.form_invalid(form)
-        except Exception as exc:
-            logger.exception("Unexpected error in symptom checker")
+        except DatabaseError as exc:
+            # transient database failures get a one-line log; the traceback
+            # is only formatted when debug logging is on.  Anything else
+            # propagates to Django's 500 handling, which logs it once.
+            logger.error("diagnosis failed for patient %s: %s", patient_id, exc)
+            logger.debug("diagnosis failure traceback", exc_info=True)
             messages.error(
                 self.request,
                 "An unexpected error occurred. Please try again.",
@@ -104,31 +160,42 @@ class DiagnosisResultDetailView(DetailView):
     template_name = "patient_cases/diagnosis_result.html"
     context_object_name = "case"
 
+    def get_queryset(self):
+        # load the case's traces, newest first, alongside the case
+        return super().get_queryset().prefetch_related(
+            Prefetch(
+                "inference_logs",
+                queryset=InferenceTraceModel.objects.order_by("-execution_timestamp"),
+                to_attr="_ordered_logs",
+            )
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         case = self.object
 
-        # Fetch the inference trace for this case
-        trace = case.inference_logs.order_by("-execution_timestamp").first()
+        # Latest inference trace for this case, from the prefetch
+        trace = case._ordered_logs[0] if case._ordered_logs else None
         context["trace"] = trace
 
-        # Build explanation using the service
-        try:
-            strategy = ForwardChainingStrategy()
-            service = DiagnosisService(strategy=strategy)
-            explanation = service.get_explanation(case_id=case.pk)
-            context["explanation"] = explanation
-        except InferenceEngineError:
+        # Build explanation using the service, reusing the loaded case
+        # and trace rather than fetching them again
+        if trace is None:
             context["explanation"] = "Explanation not available."
+        else:
+            context["explanation"] = _diagnosis_service().explain_case(case, trace)
 
-        # Enrich inferred results with urgency info from DiseaseModel
-        from knowledge_base.models import DiseaseModel
+        # Enrich inferred results with urgency info from DiseaseModel,
+        # joining every ranked result's disease in one query
+        diseases = {
+            row.rank: row.disease
+            for row in case.results.select_related("disease")
+        }
 
         enriched_results = []
-        for result in case.inferred_results:
-            disease_id = result.get("disease_id")
-            try:
-                disease = DiseaseModel.objects.get(pk=disease_id)
+        for rank, result in enumerate(case.inferred_results):
+            disease = diseases.get(rank)
+            if disease is not None:
                 enriched = {
                     **result,
                     "urgency_level": disease.urgency_level,
@@ -136,7 +203,7 @@ class DiagnosisResultDetailView(DetailView):
                     "treatments": disease.treatments,
                     "description": disease.description,
                 }
-            except DiseaseModel.DoesNotExist:
+            else:
                 enriched = {
                     **result,
                     "urgency_level": "MEDIUM",
@@ -159,26 +226,155 @@ class CaseHistoryListView(ListView):
     """Paginated list of all past diagnostic sessions.
 
     Supports date filtering via GET params ``date_from`` and ``date_to``.
+    Pages are addressed by a ``(session_date, id)`` keyset cursor —
+    ``after`` / ``after_id`` for older cases, ``before`` / ``before_id``
+    for newer ones — so every page is an index seek instead of an
+    ``OFFSET`` scan over all earlier rows.
     """
 
     model = PatientCaseModel
     template_name = "patient_cases/case_history.html"
     context_object_name = "cases"
     paginate_by = 15
-    ordering = ["-session_date"]
+    ordering = ["-session_date", "-id"]
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        date_from = self.request.GET.get("date_from")
-        date_to = self.request.GET.get("date_to")
+        # the list renders the denormalised summary columns, never the
+        # JSON snapshots
+        qs = super().get_queryset().only(
+            "id",
+            "patient_identifier",
+            "session_date",
+            "symptom_count",
+            "top_disease_name",
+            "top_confidence",
+        )
+        # compare the raw column against day boundaries: a __date lookup
+        # casts session_date and cannot use its index
+        date_from = _start_of_day(self.request.GET.get("date_from", ""))
+        date_to = _start_of_day(self.request.GET.get("date_to", ""))
+        self.date_range = (date_from, date_to)
         if date_from:
-            qs = qs.filter(session_date__date__gte=date_from)
+            qs = qs.filter(session_date__gte=date_from)
         if date_to:
-            qs = qs.filter(session_date__date__lte=date_to)
+            qs = qs.filter(session_date__lt=date_to + timedelta(days=1))
         return qs
 
+    def paginate_queryset(self, queryset, page_size):
+        params = self.request.GET
+        after = _parse_cursor(params.get("after"), params.get("after_id"))
+        before = _parse_cursor(params.get("before"), params.get("before_id"))
+
+        if before is not None and after is None:
+            # walk forwards in time from the cursor, then restore the order
+            cursor_date, cursor_id = before
+            rows = list(
+                queryset.filter(
+                    Q(session_date__gt=cursor_date)
+                    | Q(session_date=cursor_date, id__gt=cursor_id)
+                ).order_by("session_date", "id")[: page_size + 1]
+            )
+            has_newer = len(rows) > page_size
+            rows = rows[:page_size][::-1]
+            has_older = True
+        else:
+            if after is not None:
+                cursor_date, cursor_id = after
+                queryset = queryset.filter(
+                    Q(session_date__lt=cursor_date)
+                    | Q(session_date=cursor_date, id__lt=cursor_id)
+                )
+            rows = list(queryset[: page_size + 1])
+            has_older = len(rows) > page_size
+            rows = rows[:page_size]
+            has_newer = after is not None
+
+        self.next_query = (
+            self._page_query("after", rows[-1]) if has_older and rows else ""
+        )
+        self.previous_query = (
+            self._page_query("before", rows[0]) if has_newer and rows else ""
+        )
+        return None, None, rows, bool(self.next_query or self.previous_query)
+
+    def _page_query(self, direction: str, case: PatientCaseModel) -> str:
+        """Build the query string for the page on ``direction`` of ``case``."""
+        params: dict[str, str] = {
+            key: value
+            for key in ("date_from", "date_to")
+            if (value := self.request.GET.get(key))
+        }
+        params[direction] = case.session_date.isoformat()
+        params[f"{direction}_id"] = str(case.pk)
+        return urlencode(params)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["date_from"] = self.request.GET.get("date_from", "")
         context["date_to"] = self.request.GET.get("date_to", "")
+        context["total_count"] = self._total_count()
+        context["next_query"] = self.next_query
+        context["previous_query"] = self.previous_query
+        context["filter_query"] = urlencode(
+            {
+                key: value
+                for key in ("date_from", "date_to")
+                if (value := self.request.GET.get(key))
+            }
+        )
         return context
+
+    def _total_count(self) -> int:
+        """Return the number of matching cases, cached briefly per date range.
+
+        ``COUNT(*)`` over the whole filtered table is the one query whose
+        cost grows with history size, so it is shared between requests.
+        """
+        key: str = "case_history:count:" + ":".join(
+            bound.isoformat() if bound else "" for bound in self.date_range
+        )
+        return cache.get_or_set(key, self.object_list.count, _CASE_COUNT_CACHE_TTL)
+
+
+class _EchoBuffer:
+    """File-like object whose ``write`` hands the value straight back."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+class CaseHistoryExportView(CaseHistoryListView):
+    """Stream the (date-filtered) case history as CSV.
+
+    Rows are read with ``iterator(chunk_size=...)`` (a server-side cursor
+    on PostgreSQL) and written out as they arrive, so memory stays
+    bounded however large the history grows.
+    """
+
+    def get(self, request, *args, **kwargs):
+        writer = csv.writer(_EchoBuffer())
+        header: list[str] = [
+            "case_id",
+            "patient_identifier",
+            "session_date",
+            "symptom_count",
+            "top_disease",
+            "top_confidence",
+        ]
+        rows = (
+            [
+                case.pk,
+                case.patient_identifier,
+                case.session_date.isoformat(),
+                case.symptom_count,
+                case.top_disease_name,
+                "" if case.top_confidence is None else case.top_confidence,
+            ]
+            for case in self.get_queryset().iterator(chunk_size=_EXPORT_CHUNK_SIZE)
+        )
+        response = StreamingHttpResponse(
+            (writer.writerow(row) for row in chain([header], rows)),
+            content_type="text/csv",
+        )
+        response["Content-Disposition"] = 'attachment; filename="case_history.csv"'
+        return response